@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from game.config import *
+from game.dirty_rects import DirtyRectRenderer
+from game.game_objects import Enemy
+from game.simulation import Simulation
+
+GAME_STATES = ["start", "select_player", "select_difficulty", "playing", "game_over"]
+SCALED_COUNTS = [100, 1000, 10000]
+
+def measure(fn, repeats=5, min_time=0.05):
+    # Calibrate a loop count that runs for at least min_time, then report per-call times
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops * 1e6)
+    return {"median_us": statistics.median(samples), "min_us": min(samples), "loops": loops}
+
+def bench_simulation(results, quick):
+    difficulties = [1, 5, 10] if quick else range(1, MAX_DIFFICULTY + 1)
+    for difficulty in difficulties:
+        sim = Simulation("blue", difficulty, seed=difficulty)
+        manager = sim.enemy_manager
+        results[f"update_enemies/difficulty_{difficulty}"] = measure(lambda: manager.update_enemies(difficulty))
+        results[f"check_collisions/difficulty_{difficulty}"] = measure(lambda: manager.check_collisions(sim.player))
+
+    for count in SCALED_COUNTS:
+        for store, array_enemies in (("objects", False), ("arrays", True)):
+            sim = Simulation("blue", MAX_DIFFICULTY, seed=count, enemy_count=count, array_enemies=array_enemies)
+            manager = sim.enemy_manager
+            results[f"update_enemies/{store}_{count}"] = measure(lambda: manager.update_enemies(MAX_DIFFICULTY))
+            results[f"check_collisions/{store}_{count}"] = measure(lambda: manager.check_collisions(sim.player))
+
+def bench_collisions(results):
+    # Pixel-accurate narrow phase against the rect-only test it replaces, on a field dense
+    # enough that the player's rect overlaps enemies; first_hit() doesn't move anything
+    for label, masks in (("rect", ({}, {})), ("pixel", None)):
+        for store, array_enemies in (("objects", False), ("arrays", True)):
+            sim = Simulation("blue", MAX_DIFFICULTY, seed=7, enemy_count=1000, array_enemies=array_enemies,
+                             masks=masks)
+            manager = sim.enemy_manager
+            for _ in range(300):
+                manager.update_enemies(MAX_DIFFICULTY)
+            results[f"first_hit/{label}_{store}_1000"] = measure(lambda: manager.first_hit(sim.player))
+
+def bench_autopilot(results):
+    # One full-lookahead decision (danger map + survival pass) against a crowded field
+    from game.autopilot import Autopilot
+    for store, array_enemies in (("objects", False), ("arrays", True)):
+        sim = Simulation("blue", MAX_DIFFICULTY, seed=7, enemy_count=1000, array_enemies=array_enemies)
+        for _ in range(300):
+            sim.enemy_manager.update_enemies(MAX_DIFFICULTY)
+        autopilot = Autopilot()
+        results[f"autopilot/decide_{store}_1000"] = measure(lambda: autopilot.decide(sim.player, sim.enemy_manager))
+
+def bench_rendering(results, game):
+    enemy = Enemy(WIDTH // 2, HEIGHT // 2, "dark", game.assets.enemy_sprites["dark"], 5)
+    results["enemy_draw"] = measure(lambda: enemy.draw(game.screen, HEIGHT - GROUND_HEIGHT))
+
+    game.selected_player = "blue"
+    game.reset_game()
+    for _ in range(120):
+        game.simulation.step(game.step_dt)
+
+    def render_frame(cached):
+        # Menus skip frames that wouldn't change; force one so the frame itself is measured.
+        # Uncached, the menu screen is drawn again too; cached, it is one full-screen blit.
+        game.presented_menu = None
+        if not cached:
+            game.screen_manager.menu_cache.clear()
+        game.render()
+
+    for state in GAME_STATES:
+        game.game_state = state
+        results[f"render/{state}"] = measure(lambda: render_frame(False))
+        if state != "playing":
+            results[f"render/{state}_cached"] = measure(lambda: render_frame(True))
+
+    game.game_state = "playing"
+    game.dirty_renderer = DirtyRectRenderer(game.screen, game.simulation.ground, game.profiler)
+    results["render/playing_dirty_rects"] = measure(game.render)
+    game.dirty_renderer = None
+
+def bench_assets(results):
+    from game.assets import AssetManager
+    results["asset_manager_load"] = measure(AssetManager, repeats=3, min_time=0)
+
+def run_benchmarks(quick=False):
+    from game.game import Game
+    game = Game(record_replays=False, leaderboard_path=None)
+    results = {}
+    bench_assets(results)
+    bench_simulation(results, quick)
+    bench_collisions(results)
+    bench_autopilot(results)
+    bench_rendering(results, game)
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:45s} {result['median_us']:12.2f} us   (mới)")
+            continue
+        change = result["median_us"] / base["median_us"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"{name:45s} {result['median_us']:12.2f} us  {change:+8.1%}  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pokemon Dodger benchmark suite")
+    parser.add_argument("--out", default="bench_results.json", help="where to write results as JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="fewer difficulty levels")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.quick)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark chậm hơn baseline quá {args.threshold:.0%}")
+            return 1
+    else:
+        for name, result in sorted(results.items()):
+            print(f"{name:45s} {result['median_us']:12.2f} us")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
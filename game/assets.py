@@ -1,25 +1,69 @@
 import pygame
 import os
 from .config import *
+from .atlas import SpriteAtlas, slice_frames, sprite_sources
+
+def build_masks(sprites):
+    # One collision mask per sprite frame. A frame that failed to load raises, headless or
+    # windowed alike: rect collisions would quietly give different scores and replays.
+    missing = [key for key, frames in sprites.items() if not frames or not all(frames)]
+    if missing:
+        raise RuntimeError(f"Không thể tạo mask va chạm, thiếu sprite: {', '.join(missing)}")
+    return {key: [pygame.mask.from_surface(frame) for frame in frames] for key, frames in sprites.items()}
+
+_collision_masks = None
+
+def collision_masks():
+    # (player masks, enemy masks) by type for simulations that run without an AssetManager
+    # (replays, training, the match server). Built once per process from the same frames
+    # the game draws, so headless runs collide exactly like the windowed game (and, like it,
+    # raise without the sprites).
+    global _collision_masks
+    if _collision_masks is None:
+        frames = {}
+        try:
+            atlas = SpriteAtlas.load(ATLAS_PATH)
+            for key in sprite_sources():
+                frames[key] = atlas.frames(key)
+        except Exception:
+            try:
+                for key, (file_name, num_frames, layout) in sprite_sources().items():
+                    frames[key] = slice_frames(os.path.join(IMAGE_DIR, file_name), num_frames, layout)
+            except Exception as e:
+                raise RuntimeError(f"Không thể tạo mask va chạm từ {IMAGE_DIR}: {e}") from e
+        masks = build_masks(frames)
+        _collision_masks = (
+            {player_type: masks.get(f"player/{player_type}") for player_type in PLAYER_TYPES},
+            {enemy_type: masks.get(f"enemy/{enemy_type}") for enemy_type in ENEMY_TYPES},
+        )
+    return _collision_masks
 
 class AssetManager:
-    def __init__(self):
+    # deferred: load only what the start screen needs; the caller runs load_deferred_assets()
+    # (usually on a game.startup.AssetLoader thread) before anything else is drawn
+    def __init__(self, deferred=False):
         self.fonts = {}
         self.images = {}
         self.sounds = {}
         self.player_sprites = {}
         self.enemy_sprites = {}
-        self.load_all_assets()
+        self.player_masks = {}
+        self.enemy_masks = {}
+        self.atlas = None
+        self.music_paths = {}
+        self.load_startup_assets()
+        if not deferred:
+            self.load_deferred_assets()
     
     def load_font(self, size, font_name="vietnam-black-font.ttf"):
         try:
-            font_path = os.path.join('assets', 'font', font_name)
+            font_path = os.path.join(ASSET_DIR, 'font', font_name)
             return pygame.font.Font(font_path, size)
         except:
             return pygame.font.SysFont(None, size)
     
     def load_image(self, name, size=(50, 50)):
-        path = os.path.join('assets', 'images', name)
+        path = os.path.join(IMAGE_DIR, name)
         try:
             image = pygame.image.load(path)
             return pygame.transform.scale(image, size)
@@ -46,64 +90,71 @@ class AssetManager:
             return False
     
     def load_player_spritesheet(self, name):
-        path = os.path.join('assets', 'images', name)
+        path = os.path.join(IMAGE_DIR, name)
         try:
-            spritesheet = pygame.image.load(path)
-            width = spritesheet.get_width() // 8
-            height = spritesheet.get_height()
-            frames = []
-            
-            for i in range(8):
-                frame = pygame.Surface((width, height), pygame.SRCALPHA)
-                frame.blit(spritesheet, (0, 0), (i * width, 0, width, height))
-                frames.append(pygame.transform.scale(frame, (PLAYER_SIZE, PLAYER_SIZE)))
-            
-            return frames
+            return slice_frames(path, PLAYER_FRAME_COUNT, "horizontal")
         except Exception as e:
             print(f"Không thể tải sprite sheet: {path}, lỗi: {e}")
-            return [None] * 8
+            return [None] * PLAYER_FRAME_COUNT
     
-    def load_enemy_spritesheet(self, name):
-        path = os.path.join('assets', 'images', name)
+    def load_enemy_spritesheet(self, name, enemy_type):
+        path = os.path.join(IMAGE_DIR, name)
+        num_frames = ENEMY_FRAME_COUNTS[enemy_type]
         try:
-            spritesheet = pygame.image.load(path)
-            
-            num_frames = 4 if "blue" in name else 6
-            
-            width = spritesheet.get_width()
-            height = spritesheet.get_height() // num_frames
-            frames = []
-            
-            for i in range(num_frames):
-                frame = pygame.Surface((width, height), pygame.SRCALPHA)
-                frame.blit(spritesheet, (0, 0), (0, i * height, width, height))
-                frames.append(pygame.transform.scale(frame, (PLAYER_SIZE, PLAYER_SIZE)))
-            
-            return frames
+            return slice_frames(path, num_frames, "vertical")
         except Exception as e:
             print(f"Không thể tải sprite sheet kẻ thù: {path}, lỗi: {e}")
-            return [None] * (4 if "blue" in name else 6)
+            return [None] * num_frames
+    
+    def load_sprites(self):
+        try:
+            self.atlas = SpriteAtlas.load(ATLAS_PATH)
+        except Exception as e:
+            print(f"Không thể tải sprite atlas: {ATLAS_PATH}, lỗi: {e}")
+            self.atlas = None
+        
+        for player_type in PLAYER_TYPES:
+            if self.atlas:
+                self.player_sprites[player_type] = self.atlas.frames(f"player/{player_type}")
+            else:
+                self.player_sprites[player_type] = self.load_player_spritesheet(f"{player_type}_player.png")
+        
+        for enemy_type in ENEMY_TYPES:
+            if self.atlas:
+                self.enemy_sprites[enemy_type] = self.atlas.frames(f"enemy/{enemy_type}")
+            else:
+                self.enemy_sprites[enemy_type] = self.load_enemy_spritesheet(f"{enemy_type}_enemy.png", enemy_type)
+    
+    def load_masks(self):
+        # Pixel-accurate collision data, built once here instead of per check; raises (through
+        # AssetLoader.wait()) when a sheet is missing, like collision_masks() does headless
+        self.player_masks = build_masks(self.player_sprites)
+        self.enemy_masks = build_masks(self.enemy_sprites)
     
-    def load_all_assets(self):
+    def load_startup_assets(self):
+        # Just what the start screen draws
         self.fonts['small'] = self.load_font(18)
         self.fonts['normal'] = self.load_font(24)
         self.fonts['title'] = self.load_font(48)
         
         self.images['logo'] = self.load_image("logo.jpg", (800, 600))
+    
+    def load_deferred_assets(self):
+        self.load_images()
+        self.load_sprites()
+        self.load_masks()
+        self.load_sounds()
+    
+    def load_images(self):
         self.images['heart'] = self.load_image("heart.png", (30, 30))
-        
-        for player_type in PLAYER_TYPES:
-            self.player_sprites[player_type] = self.load_player_spritesheet(f"{player_type}_player.png")
-        
-        for enemy_type in ENEMY_TYPES:
-            self.enemy_sprites[enemy_type] = self.load_enemy_spritesheet(f"{enemy_type}_enemy.png")
-        
-        self.sounds['click'] = self.load_sound(os.path.join('assets', 'sounds', 'click.ogg'), CLICK_VOLUME)
-        self.sounds['collision'] = self.load_sound(os.path.join('assets', 'sounds', 'touch.ogg'), COLLISION_VOLUME)
+    
+    def load_sounds(self):
+        self.sounds['click'] = self.load_sound(os.path.join(ASSET_DIR, 'sounds', 'click.ogg'), CLICK_VOLUME)
+        self.sounds['collision'] = self.load_sound(os.path.join(ASSET_DIR, 'sounds', 'touch.ogg'), COLLISION_VOLUME)
         
         self.music_paths = {
-            'menu': os.path.join('assets', 'musics', 'before_play.ogg'),
-            'playing': os.path.join('assets', 'musics', 'playing.ogg')
+            'menu': os.path.join(ASSET_DIR, 'musics', 'before_play.ogg'),
+            'playing': os.path.join(ASSET_DIR, 'musics', 'playing.ogg')
         }
     
     def get_player_image(self, player_type):
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import pygame
+from .config import *
+
+# File layout: MAGIC, u32 metadata length, JSON metadata, zero padding up to the pixel
+# offset, then the packed atlas pixels in PIXEL_FORMAT (ARGB8888 in memory, the same
+# layout as 32-bit display surfaces, so blits from it need no conversion).
+MAGIC = b"PDATLAS1"
+HEADER = struct.Struct("<8sI")
+PIXEL_FORMAT = "BGRA"
+PIXEL_ALIGN = 64
+ATLAS_COLUMNS = 8
+
+def sprite_sources():
+    sources = {}
+    for player_type in PLAYER_TYPES:
+        sources[f"player/{player_type}"] = (f"{player_type}_player.png", PLAYER_FRAME_COUNT, "horizontal")
+    for enemy_type in ENEMY_TYPES:
+        sources[f"enemy/{enemy_type}"] = (f"{enemy_type}_enemy.png", ENEMY_FRAME_COUNTS[enemy_type], "vertical")
+    return sources
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def slice_frames(path, num_frames, layout, size=(PLAYER_SIZE, PLAYER_SIZE)):
+    spritesheet = pygame.image.load(path)
+    if layout == "horizontal":
+        width = spritesheet.get_width() // num_frames
+        height = spritesheet.get_height()
+        areas = [(i * width, 0, width, height) for i in range(num_frames)]
+    else:
+        width = spritesheet.get_width()
+        height = spritesheet.get_height() // num_frames
+        areas = [(0, i * height, width, height) for i in range(num_frames)]
+
+    frames = []
+    for area in areas:
+        frame = pygame.Surface((width, height), pygame.SRCALPHA)
+        frame.blit(spritesheet, (0, 0), area)
+        frames.append(pygame.transform.scale(frame, size))
+    return frames
+
+def build_atlas(atlas_path=ATLAS_PATH, image_dir=IMAGE_DIR):
+    sources = sprite_sources()
+    total_frames = sum(num_frames for _, num_frames, _ in sources.values())
+    rows = (total_frames + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+    atlas = pygame.Surface((ATLAS_COLUMNS * PLAYER_SIZE, rows * PLAYER_SIZE), pygame.SRCALPHA)
+
+    metadata = {"format": PIXEL_FORMAT, "size": list(atlas.get_size()), "sources": {}, "sprites": {}}
+    slot = 0
+    for key, (file_name, num_frames, layout) in sources.items():
+        path = os.path.join(image_dir, file_name)
+        rects = []
+        for frame in slice_frames(path, num_frames, layout):
+            x = (slot % ATLAS_COLUMNS) * PLAYER_SIZE
+            y = (slot // ATLAS_COLUMNS) * PLAYER_SIZE
+            atlas.blit(frame, (x, y))
+            rects.append([x, y, PLAYER_SIZE, PLAYER_SIZE])
+            slot += 1
+        metadata["sprites"][key] = rects
+        metadata["sources"][file_name] = {"mtime": os.path.getmtime(path), "sha1": file_hash(path)}
+    write_atlas(atlas_path, metadata, pygame.image.tobytes(atlas, PIXEL_FORMAT))
+
+def write_atlas(atlas_path, metadata, pixels):
+    meta_bytes = json.dumps(metadata).encode("utf-8")
+    pixel_offset = -(-(HEADER.size + len(meta_bytes)) // PIXEL_ALIGN) * PIXEL_ALIGN
+    metadata_block = HEADER.pack(MAGIC, len(meta_bytes)) + meta_bytes
+    # A temp file of its own, so processes rebuilding at the same time (sweep workers) never
+    # write into each other's file; whichever os.replace lands last wins with a whole atlas
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(atlas_path) or ".", prefix=".sprites-",
+                                     suffix=".tmp", delete=False) as f:
+        temp_path = f.name
+        f.write(metadata_block)
+        f.write(b"\0" * (pixel_offset - len(metadata_block)))
+        f.write(pixels)
+    try:
+        # Temp files are created owner-only; the atlas is an ordinary asset
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, atlas_path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+def read_metadata(f):
+    magic, meta_length = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("not a sprite atlas")
+    pixel_offset = -(-(HEADER.size + meta_length) // PIXEL_ALIGN) * PIXEL_ALIGN
+    return json.loads(f.read(meta_length)), pixel_offset
+
+def check_sources(metadata, image_dir=IMAGE_DIR):
+    # (stale, touched): stale when a sprite sheet changed; touched when some only have a new
+    # mtime (same SHA-1), which is then updated in metadata so the next start skips the hash
+    expected = {file_name for file_name, _, _ in sprite_sources().values()}
+    if set(metadata["sources"]) != expected:
+        return True, False
+    touched = False
+    for file_name, info in metadata["sources"].items():
+        path = os.path.join(image_dir, file_name)
+        # mtime is the cheap check; only hash the file when it moved
+        mtime = os.path.getmtime(path)
+        if mtime != info["mtime"]:
+            if file_hash(path) != info["sha1"]:
+                return True, False
+            info["mtime"] = mtime
+            touched = True
+    return False, touched
+
+class SpriteAtlas:
+    # Memory-maps an atlas file; every frame is a subsurface of one shared surface that
+    # wraps the mapped pixels directly, so nothing is decoded, scaled or copied at startup.
+    def __init__(self, atlas_path=ATLAS_PATH):
+        with open(atlas_path, "rb") as f:
+            self.metadata, pixel_offset = read_metadata(f)
+            # Copy-on-write mapping: pages stay shared with the page cache unless written
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.surface = pygame.image.frombuffer(
+            memoryview(self.mapping)[pixel_offset:],
+            tuple(self.metadata["size"]),
+            self.metadata["format"]
+        )
+
+    @classmethod
+    def load(cls, atlas_path=ATLAS_PATH):
+        # Opens the atlas, (re)building it first when it is missing or its sources changed
+        rebuild = not os.path.exists(atlas_path)
+        if not rebuild:
+            try:
+                with open(atlas_path, "rb") as f:
+                    metadata, pixel_offset = read_metadata(f)
+                    rebuild, touched = check_sources(metadata)
+                    if touched:
+                        f.seek(pixel_offset)
+                        pixels = f.read()
+                if touched:
+                    # Same pixels, fresh mtimes
+                    write_atlas(atlas_path, metadata, pixels)
+            except (OSError, ValueError, KeyError, struct.error):
+                rebuild = True
+        if rebuild:
+            build_atlas(atlas_path)
+        return cls(atlas_path)
+
+    def frames(self, key):
+        return [self.surface.subsurface(rect) for rect in self.metadata["sprites"][key]]
+
+if __name__ == "__main__":
+    build_atlas()
+    print(f"Đã tạo sprite atlas: {ATLAS_PATH}")
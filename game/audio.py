@@ -0,0 +1,81 @@
+import pygame
+from .config import *
+
+class AudioManager:
+    # Music tracks are decoded once up front and played as looping Sounds on two reserved
+    # channels, so a track change is a crossfade between channels instead of a synchronous
+    # mixer.music.load. Effects get their own reserved channels per category, and repeats of
+    # the same effect inside its minimum interval are merged into the one already playing.
+    #
+    # Nothing plays until load() has run (it decodes the music, so Game runs it on the
+    # startup asset loader thread).
+    def __init__(self, assets):
+        self.assets = assets
+        self.enabled = False
+        self.music = {}
+        self.channels = {}
+        self.current_music = None
+        self.current_track = None
+        self.music_channel = 0
+        self.last_played = {}
+        self.channel_started = {}
+        self.merged = 0
+        self.stolen = 0
+
+    def load(self):
+        if pygame.mixer.get_init() is None:
+            return
+
+        total = sum(AUDIO_CHANNELS.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)
+
+        index = 0
+        for category, count in AUDIO_CHANNELS.items():
+            self.channels[category] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            index += count
+
+        for name, path in self.assets.music_paths.items():
+            self.music[name] = self.assets.load_sound(path, MUSIC_VOLUME)
+        self.enabled = True
+
+    def play_music(self, name, fade_ms=MUSIC_CROSSFADE_MS):
+        if not self.enabled or name == self.current_music:
+            return
+        self.current_music = name
+
+        # A state without a track of its own keeps the menu track going, as the game did
+        # before it had per-state music
+        sound = self.music.get(name) or self.music.get("menu")
+        if sound is self.current_track:
+            return
+        self.current_track = sound
+
+        music_channels = self.channels["music"]
+        music_channels[self.music_channel].fadeout(fade_ms)
+        if sound:
+            self.music_channel = (self.music_channel + 1) % len(music_channels)
+            music_channels[self.music_channel].play(sound, loops=-1, fade_ms=fade_ms)
+
+    def play_sound(self, name, category="sfx"):
+        sound = self.assets.sounds.get(name)
+        if not self.enabled or not sound:
+            return
+
+        now = pygame.time.get_ticks()
+        last = self.last_played.get(name)
+        if last is not None and now - last < SOUND_MIN_INTERVAL_MS.get(name, 0):
+            self.merged += 1
+            return
+        self.last_played[name] = now
+
+        channels = self.channels[category]
+        free = [channel for channel in channels if not channel.get_busy()]
+        if free:
+            channel = free[0]
+        else:
+            # Every voice in the category is busy: steal the one that started first
+            channel = min(channels, key=lambda channel: self.channel_started.get(channel, 0))
+            self.stolen += 1
+        self.channel_started[channel] = now
+        channel.play(sound)
@@ -0,0 +1,176 @@
+import time
+import numpy as np
+import pygame
+from .config import *
+from .enemy_array import ArrayEnemyManager
+
+# Built-in controller for unattended soak runs of the real game and as a baseline policy for
+# headless runs: a callable like the ones in policies.py. Each decision builds a danger map
+# over (time slice, player column) from the enemies falling towards the player, predicted
+# from base_speed * speed_modifier, and keeps it as one bitset of clear columns per slice.
+# Backwards passes over those (a shift-and-mask per slice) find how long the player can stay
+# clear from each column it can reach. Only the band above the player is read, through the
+# spatial grid or a NumPy mask, and each enemy is a single rectangle in the map, so the
+# search itself costs the same whatever the enemy count.
+
+# Lightning Dash, as Player.use_ability() sets it up
+DASH_SPEED = 4.0
+DASH_TICKS = 0.3 * BASE_TICK_RATE
+
+# Difference-array weights of a rectangle's four corners
+CORNER_WEIGHTS = np.array([1.0, -1.0, -1.0, 1.0])
+
+def threats(manager, band):
+    # x, y and fall speed (pixels per 60 Hz tick) of the enemies inside band, from either store
+    if isinstance(manager, ArrayEnemyManager):
+        index = manager.query_indices(band)
+        return manager.x[index], manager.y[index], manager.base_speed[index] * manager.speed_modifier[index]
+    enemies = manager.query([band])
+    n = len(enemies)
+    x = np.fromiter((enemy.rect.x for enemy in enemies), np.float64, n)
+    y = np.fromiter((enemy.y for enemy in enemies), np.float64, n)
+    speed = np.fromiter((enemy.base_speed * enemy.speed_modifier for enemy in enemies), np.float64, n)
+    return x, y, speed
+
+def dilate(bits, radius):
+    # Columns within radius of a set bit, by doubling shifts
+    reach = 0
+    while reach < radius:
+        shift = min(reach + 1, radius - reach)
+        bits |= (bits << shift) | (bits >> shift)
+        reach += shift
+    return bits
+
+class Autopilot:
+    def __init__(self, lookahead_ticks=AUTOPILOT_LOOKAHEAD_TICKS, slice_ticks=AUTOPILOT_SLICE_TICKS,
+                 budget_ms=AUTOPILOT_BUDGET_MS, adaptive=True):
+        self.slice_ticks = slice_ticks
+        self.max_slices = max(AUTOPILOT_MIN_SLICES, lookahead_ticks // slice_ticks)
+        self.slices = self.max_slices
+        self.budget = budget_ms / 1000
+        # Adaptive lookahead follows wall-clock decision time, so it is only for the real game;
+        # headless runs keep the full lookahead and stay reproducible per seed
+        self.adaptive = adaptive
+        # Column c is the player's left edge at c * AUTOPILOT_COLUMN
+        self.columns = (WIDTH - PLAYER_SIZE) // AUTOPILOT_COLUMN + 1
+        self.all_columns = (1 << self.columns) - 1
+
+        self.decisions = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.over_budget = 0
+        self.abilities = 0
+
+    def __call__(self, sim):
+        started = time.perf_counter()
+        decision = self.decide(sim.player, sim.enemy_manager)
+        self.account(time.perf_counter() - started)
+        return decision
+
+    def account(self, elapsed):
+        self.decisions += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        # Over budget: look less far ahead; well under it: win the lookahead back a slice at a time
+        if elapsed > self.budget:
+            self.over_budget += 1
+            if self.adaptive:
+                self.slices = max(AUTOPILOT_MIN_SLICES, self.slices * 3 // 4)
+        elif self.adaptive and elapsed < self.budget / 2 and self.slices < self.max_slices:
+            self.slices += 1
+
+    def danger_map(self, player, manager):
+        # Per slice, a bitset of the columns where the player would be clear of every enemy.
+        # Each enemy is one rectangle (the slices it spends level with the player x the columns
+        # it covers) in a 2D difference array; two cumulative sums fill them all in.
+        slices, columns = self.slices, self.columns
+        rect = player.rect
+        band = pygame.Rect(-PLAYER_SIZE, rect.y - AUTOPILOT_BAND, WIDTH + 2 * PLAYER_SIZE, AUTOPILOT_BAND + rect.h)
+        x, y, speed = threats(manager, band)
+        if not len(x):
+            return [self.all_columns] * slices
+
+        fall = np.maximum(speed, 1e-3) * self.slice_ticks
+        first = np.floor((rect.y - PLAYER_SIZE - y) / fall).clip(0, slices).astype(np.intp)
+        last = (np.floor((rect.bottom - y) / fall) + 1).clip(0, slices).astype(np.intp)
+        left = np.ceil((x - PLAYER_SIZE - AUTOPILOT_MARGIN) / AUTOPILOT_COLUMN).clip(0, columns).astype(np.intp)
+        right = (np.floor((x + PLAYER_SIZE + AUTOPILOT_MARGIN) / AUTOPILOT_COLUMN) + 1).clip(0, columns).astype(np.intp)
+
+        stride = columns + 1
+        corners = np.concatenate((first * stride + left, first * stride + right,
+                                  last * stride + left, last * stride + right))
+        counts = np.bincount(corners, np.repeat(CORNER_WEIGHTS, len(x)), (slices + 1) * stride)
+        counts = counts.reshape(slices + 1, stride)
+        np.cumsum(counts, axis=0, out=counts)
+        np.cumsum(counts, axis=1, out=counts)
+        clear = np.packbits(counts[:slices, :columns] < 0.5, axis=1, bitorder="little")
+        return [int.from_bytes(row.tobytes(), "little") for row in clear]
+
+    def radii(self, speed_modifier, boost_ticks):
+        # Columns the player can cover per slice, faster while a dash lasts
+        return [max(1, int(PLAYER_SPEED * (speed_modifier if k * self.slice_ticks < boost_ticks else 1.0)
+                           * self.slice_ticks / AUTOPILOT_COLUMN))
+                for k in range(self.slices)]
+
+    def clear_columns(self, free, radii, horizon):
+        # Columns the player can be at in slice 1 and stay clear from until slice horizon,
+        # working backwards: clear now and within one move of a column that stays clear
+        bits = free[horizon - 1]
+        for k in range(horizon - 2, 0, -1):
+            bits = free[k] & dilate(bits, radii[k])
+        return bits
+
+    def target(self, free, column, radii):
+        # Column to head for during the next slice and how many slices that keeps the player
+        # clear: the longest clear stretch within reach (binary search over the horizon when
+        # the whole of it can't be), then the nearest column, then the one nearer the middle
+        radius = radii[0]
+        lo, hi = max(0, column - radius), min(self.columns - 1, column + radius)
+        window = ((1 << (hi - lo + 1)) - 1) << lo
+        clear = self.slices
+        bits = self.clear_columns(free, radii, clear) & window
+        if not bits:
+            clear, failed, bits = 1, self.slices, window
+            while failed - clear > 1:
+                horizon = (clear + failed) // 2
+                found = self.clear_columns(free, radii, horizon) & window
+                if found:
+                    clear, bits = horizon, found
+                else:
+                    failed = horizon
+
+        middle = self.columns // 2
+        for distance in range(radius + 1):
+            options = [c for c in (column - distance, column + distance) if lo <= c <= hi and bits >> c & 1]
+            if options:
+                return min(options, key=lambda c: abs(c - middle)), clear
+        return column, clear
+
+    def decide(self, player, manager):
+        free = self.danger_map(player, manager)
+        column = min(self.columns - 1, round(player.x / AUTOPILOT_COLUMN))
+        boost = player.ability_duration * BASE_TICK_RATE if player.dash_speed_modifier > 1 else 0
+        radii = self.radii(player.dash_speed_modifier, boost)
+        target, clear = self.target(free, column, radii)
+
+        ability = False
+        if clear < self.slices and player.can_use_ability():
+            if player.player_type == "blue":
+                # Dash only if the faster move gets somewhere safer
+                dash_target, dash_clear = self.target(free, column, self.radii(DASH_SPEED, DASH_TICKS))
+                if dash_clear > clear:
+                    target, ability = dash_target, True
+            elif clear < AUTOPILOT_PANIC_SLICES:
+                # Phoenix Shield / Time Warp: nothing reachable stays clear, so take the hit protected
+                ability = True
+        if ability:
+            self.abilities += 1
+
+        offset = target * AUTOPILOT_COLUMN - player.x
+        return offset < -AUTOPILOT_COLUMN / 2, offset > AUTOPILOT_COLUMN / 2, ability
+
+    def report(self):
+        mean = self.total_time / max(1, self.decisions) * 1000
+        return (f"Autopilot: {self.decisions} quyết định, TB {mean:.3f} ms, tối đa {self.max_time * 1000:.3f} ms, "
+                f"{self.over_budget} lần quá {self.budget * 1000:g} ms, nhìn trước "
+                f"{self.slices * self.slice_ticks} tick, dùng chiêu {self.abilities} lần")
@@ -0,0 +1,195 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+import numpy as np
+import pygame
+from .config import *
+
+# Gameplay video capture. grab() copies the frame's raw pixel buffer (one memcpy through a
+# zero-copy view of the surface) into a free slot of a preallocated ring and hands the slot
+# to a writer thread, which converts it to RGB and writes it out. When every slot is still
+# waiting to be written the frame is dropped instead of stalling the game loop.
+#
+# "raw" writes one headerless rgb24 stream (the size and rate are in the file name, see
+# ffmpeg_command()); "png" writes a numbered image sequence. Frames are numbered by
+# capture time, so dropped frames repeat the previous one in the raw stream and leave gaps
+# in the image sequence rather than speeding the clip up.
+
+CAPTURE_FORMATS = ("raw", "png")
+
+class FrameCapture:
+    def __init__(self, surface, path, fmt="raw", fps=CAPTURE_FPS, ring_size=CAPTURE_RING_SIZE, drop=True,
+                 clock=time.perf_counter):
+        if surface.get_bytesize() not in (3, 4):
+            raise ValueError(f"unsupported pixel format: {surface.get_bitsize()} bits")
+        self.size = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.bytesize = surface.get_bytesize()
+        # Byte of each colour within a pixel (pygame surfaces are little-endian)
+        self.channels = [shift // 8 for shift in surface.get_shifts()[:3]]
+        self.fmt = fmt
+        self.fps = fps
+        self.clock = clock
+        # Headless capture can afford to wait for the writer; the game loop can't
+        self.drop = drop
+
+        self.ring = [np.empty(self.pitch * self.size[1], dtype=np.uint8) for _ in range(ring_size)]
+        self.free = queue.Queue()
+        for slot in range(ring_size):
+            self.free.put(slot)
+        self.pending = queue.Queue()
+
+        self.start = None
+        self.last_index = -1
+        self.grabbed = 0
+        self.dropped = 0
+        self.written = 0
+        self.grab_time = 0.0
+
+        w, h = self.size
+        if fmt == "raw":
+            self.path = f"{path}_{w}x{h}_{fps}fps.rgb"
+            self.output = open(self.path, "wb")
+        else:
+            self.path = path
+            os.makedirs(path, exist_ok=True)
+            self.output = None
+        self.writer = threading.Thread(target=self.write_loop, name="capture-writer", daemon=True)
+        self.writer.start()
+
+    def due(self):
+        # Index of the frame the clock is at, or None if it was already taken
+        now = self.clock()
+        if self.start is None:
+            self.start = now
+        index = int((now - self.start) * self.fps + 1e-6)
+        return index if index > self.last_index else None
+
+    def grab(self, surface):
+        index = self.due()
+        if index is None:
+            return False
+        self.last_index = index
+
+        try:
+            slot = self.free.get(block=not self.drop)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        started = time.perf_counter()
+        view = surface.get_view("0")
+        np.copyto(self.ring[slot], np.frombuffer(view, dtype=np.uint8))
+        # Drop the view right away: a locked surface can't be blitted to
+        del view
+        self.grab_time += time.perf_counter() - started
+
+        self.pending.put((slot, index))
+        self.grabbed += 1
+        return True
+
+    def write_loop(self):
+        w, h = self.size
+        rgb = np.empty((h, w, 3), dtype=np.uint8)
+        previous = -1
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            slot, index = item
+            if self.output and previous >= 0:
+                # Hold the previous frame over the ones that were dropped
+                for _ in range(index - previous - 1):
+                    self.output.write(rgb)
+
+            pixels = self.ring[slot].reshape(h, self.pitch)[:, :w * self.bytesize].reshape(h, w, self.bytesize)
+            np.take(pixels, self.channels, axis=2, out=rgb)
+            self.free.put(slot)
+
+            if self.output:
+                self.output.write(rgb)
+            else:
+                image = pygame.image.frombuffer(rgb, self.size, "RGB")
+                pygame.image.save(image, os.path.join(self.path, f"frame_{index:06d}.png"))
+            previous = index
+            self.written += 1
+        if self.output:
+            self.output.close()
+
+    def close(self):
+        self.pending.put(None)
+        self.writer.join()
+        return self
+
+    def ffmpeg_command(self):
+        w, h = self.size
+        return f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r {self.fps} -i {self.path} clip.mp4"
+
+    def report(self):
+        line = (f"Đã ghi {self.written} khung hình vào {self.path} ({self.dropped} khung bị bỏ, "
+                f"chép TB {self.grab_time / max(1, self.grabbed) * 1000:.2f} ms/khung)")
+        if self.fmt == "raw":
+            line += f"\n  Chuyển sang mp4: {self.ffmpeg_command()}"
+        return line
+
+def capture_path(directory=CAPTURE_DIR, name=None):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name or time.strftime("clip_%Y%m%d_%H%M%S"))
+
+def capture_replay(replay, path, fmt="raw", fps=CAPTURE_FPS, render_scale=RENDER_SCALE):
+    # Renders a replay through the normal game renderer, headless and as fast as possible,
+    # with one frame per 1/fps of simulated time
+    from .game import Game
+    game = Game(record_replays=False, leaderboard_path=None, render_scale=render_scale)
+    game.selected_player = replay.player_type
+    game.selected_enemies = replay.selected_enemies
+    game.enemy_count = replay.enemy_count
+    game.simulation_hz = replay.sim_hz
+    game.screen_manager.difficulty_level = replay.difficulty
+    game.screen_manager.endless_mode = replay.endless
+    game.reset_game()
+    game.simulation.reset(replay.seed)
+    game.game_state = "playing"
+
+    sim = game.simulation
+    game.capture = FrameCapture(game.screen, path, fmt, fps, drop=False, clock=lambda: sim.time)
+    game.render()
+    for game.player_input in replay.inputs():
+        game.update_game(game.step_dt)
+        if game.game_state != "playing":
+            break
+        # Only frames that will be kept get drawn
+        if game.capture.due() is not None:
+            game.render()
+    capture = game.capture.close()
+    game.capture = None
+    return capture, sim
+
+def main(argv=None):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from .replay import Replay
+
+    parser = argparse.ArgumentParser(description="Render recorded runs to video, headless")
+    parser.add_argument("replays", nargs="+", help="replay files (.pdr)")
+    parser.add_argument("--out", default=CAPTURE_DIR, help="output directory")
+    parser.add_argument("--format", choices=CAPTURE_FORMATS, default="raw")
+    parser.add_argument("--fps", type=int, default=CAPTURE_FPS)
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE)
+    args = parser.parse_args(argv)
+
+    for path in args.replays:
+        replay = Replay.load(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        start = time.perf_counter()
+        capture, sim = capture_replay(replay, capture_path(args.out, name), args.format, args.fps,
+                                      args.render_scale)
+        print(f"{path}: {sim.tick} tick, điểm {sim.score}, {time.perf_counter() - start:.1f}s")
+        print(capture.report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
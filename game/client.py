@@ -0,0 +1,271 @@
+import asyncio
+import collections
+import threading
+import time
+import numpy as np
+from .config import *
+from .enemy_array import ArrayEnemyManager
+from .game_objects import Ground, Player
+from .simulation import drive_player
+from .replay import encode_input
+from .netcode import (ENEMY_FIELDS, FRAME, HELLO, INPUT, MSG_HELLO, MSG_INPUT, MSG_SNAPSHOT, MSG_WELCOME,
+                      POSITION_SCALE, SNAPSHOT, WELCOME, NetStats, apply_player_fields, decode_state, frame,
+                      read_frame, split_state)
+
+class NetSession:
+    # Client side of a networked match, shaped like Simulation (player, enemy_manager, ground,
+    # score, step()) so Game can drive and draw it. The local player is predicted: inputs are
+    # applied immediately and kept until the server acknowledges them, then replayed on top
+    # of each authoritative snapshot. Enemies and other players are shown as the server sent them.
+    #
+    # receive() runs on the network side and only decodes into an inbox; everything else,
+    # including applying snapshots, happens in step() on the game side.
+    def __init__(self, player_type, player_sprites=None, enemy_sprites=None):
+        self.player_type = player_type
+        self.player_sprites = player_sprites or {}
+        self.send = None
+        self.inbox = collections.deque()
+        self.stats = NetStats()
+
+        self.player_id = None
+        self.sim_hz = SIMULATION_HZ
+        self.dt = 1.0 / SIMULATION_HZ
+        self.snapshot_every = NET_SNAPSHOT_EVERY
+        self.difficulty = 1
+        self.endless = False
+        self.started = False
+        self.connected = False
+        self.game_over = False
+
+        self.ground = Ground()
+        self.player = Player(WIDTH // 2 - PLAYER_SIZE // 2, HEIGHT - GROUND_HEIGHT - PLAYER_SIZE,
+                             self.player_sprites.get(player_type), player_type)
+        self.others = {}
+        self.enemy_manager = ArrayEnemyManager()
+        self.enemy_manager.types = list(ENEMY_TYPES)
+        self.enemy_manager.sprites = [(enemy_sprites or {}).get(enemy_type) for enemy_type in ENEMY_TYPES]
+
+        self.events = []
+        self.score = 0
+        self.wave = None
+        self.tick = 0
+        self.time = 0.0
+        self.since_snapshot = 0
+
+        self.seq = 0
+        # (sequence number, input, predicted x after it, send time) not yet acknowledged
+        self.pending = collections.deque()
+        self.baselines = {}
+        self.last_tick = 0
+
+    def transmit(self, payload):
+        self.stats.sent(len(payload) + FRAME.size)
+        self.send(payload)
+
+    # Network side
+
+    def hello(self):
+        self.transmit(HELLO.pack(MSG_HELLO, PLAYER_TYPES.index(self.player_type)))
+
+    def receive(self, message):
+        self.stats.received(len(message) + FRAME.size)
+        if message[0] == MSG_WELCOME:
+            self.inbox.append(("welcome", WELCOME.unpack(message)))
+        elif message[0] == MSG_SNAPSHOT:
+            _, tick, baseline_tick = SNAPSHOT.unpack_from(message)
+            baseline = self.baselines.get(baseline_tick) if baseline_tick else None
+            if baseline_tick and baseline is None:
+                # Delta against a snapshot already dropped here; the next one will be usable
+                return
+            values = decode_state(message[SNAPSHOT.size:], baseline)
+            self.baselines[tick] = values
+            self.baselines.pop(tick - self.snapshot_every * NET_SNAPSHOT_HISTORY, None)
+            # Acked with the next input, so the server can diff against this snapshot
+            self.last_tick = tick
+            self.inbox.append(("snapshot", tick, values, time.perf_counter()))
+
+    def disconnected(self):
+        self.inbox.append(("closed",))
+
+    # Game side
+
+    def step(self, dt=None, left=False, right=False, ability=False):
+        self.events.clear()
+        while self.inbox:
+            self.apply(self.inbox.popleft())
+        if not self.started or self.game_over:
+            return self.events
+
+        player = self.player
+        # Sent even once knocked out: the acks keep the server sending deltas
+        self.seq += 1
+        self.transmit(INPUT.pack(MSG_INPUT, self.seq, self.last_tick, encode_input(left, right, ability)))
+        if player.hp > 0:
+            if drive_player(player, left, right, ability, self.dt):
+                self.events.append("ability")
+            player.update_abilities(self.dt)
+            self.pending.append((self.seq, (left, right, ability), player.x, time.perf_counter()))
+        else:
+            player.store_previous_position()
+
+        self.since_snapshot += 1
+        self.tick += 1
+        self.time += self.dt
+        return self.events
+
+    def apply(self, message):
+        if message[0] == "welcome":
+            (_, self.player_id, self.sim_hz, self.snapshot_every, self.difficulty, _, endless,
+             _) = message[1]
+            self.dt = 1.0 / self.sim_hz
+            self.endless = bool(endless)
+            self.connected = True
+        elif message[0] == "snapshot":
+            self.apply_snapshot(*message[1:])
+        elif not self.game_over:
+            self.game_over = True
+            self.events.append("game_over")
+
+    def apply_snapshot(self, tick, values, received_at):
+        header, players, enemies = split_state(values)
+        score, game_over, wave = header[:3]
+        self.score = score
+        self.wave = wave if self.endless else None
+
+        for fields in players:
+            player_id = fields[0]
+            if player_id == self.player_id:
+                self.reconcile(fields, received_at)
+                continue
+            other = self.others.get(player_id)
+            if other is None:
+                player_type = PLAYER_TYPES[fields[1]]
+                other = self.others[player_id] = Player(0, HEIGHT - GROUND_HEIGHT - PLAYER_SIZE,
+                                                        self.player_sprites.get(player_type), player_type)
+                apply_player_fields(other, fields)
+            other.store_previous_position()
+            apply_player_fields(other, fields)
+
+        self.apply_enemies(enemies)
+        self.since_snapshot = 0
+        self.started = True
+        if game_over and not self.game_over:
+            self.game_over = True
+            self.events.append("game_over")
+
+    def reconcile(self, fields, received_at):
+        player = self.player
+        ack = fields[-1]
+        hp = player.hp
+        previous_x = player.x
+
+        predicted_x = None
+        while self.pending and self.pending[0][0] <= ack:
+            seq, _, predicted_x, sent_at = self.pending.popleft()
+            if seq == ack:
+                self.stats.rtt.append(received_at - sent_at)
+
+        apply_player_fields(player, fields)
+        if predicted_x is not None:
+            error = abs(predicted_x - player.x)
+            if error > NET_CORRECTION_EPSILON:
+                self.stats.corrections += 1
+                self.stats.correction_px.append(error)
+
+        # Replay what the server hasn't seen yet on top of its state
+        replayed = collections.deque()
+        for seq, (left, right, ability), _, sent_at in self.pending:
+            drive_player(player, left, right, ability, self.dt)
+            player.update_abilities(self.dt)
+            replayed.append((seq, (left, right, ability), player.x, sent_at))
+        self.pending = replayed
+        # Interpolate from where the player was drawn, not from the replay's intermediate steps
+        player.prev_x = previous_x
+
+        if player.hp < hp:
+            self.events.append("collision")
+
+    def apply_enemies(self, rows):
+        manager = self.enemy_manager
+        count = len(rows)
+        resized = count != manager.count
+        if resized:
+            manager.allocate(count)
+        if not count:
+            return
+        data = np.array(rows, dtype=np.float64).reshape(count, ENEMY_FIELDS)
+        y = data[:, 1] / POSITION_SCALE
+        if resized:
+            manager.prev_y[:] = y
+        else:
+            # Enemies that jumped back up respawned; don't sweep them across the screen
+            np.copyto(manager.prev_y, np.where(y < manager.y, y, manager.y))
+        manager.x[:] = data[:, 0]
+        manager.y[:] = y
+        manager.type_index[:] = data[:, 2]
+        manager.frame[:] = data[:, 3]
+
+    def interpolation(self, alpha):
+        # Enemies move between the last two snapshots, one snapshot interval behind the server
+        return min(1.0, (self.since_snapshot + alpha) / self.snapshot_every)
+
+    def report(self):
+        s = self.stats.summary(max(self.time, 1e-9))
+        line = (f"Người chơi {self.player_id}: lên {s['up_bytes_per_s'] / 1024:.2f} KiB/s, "
+                f"xuống {s['down_bytes_per_s'] / 1024:.2f} KiB/s")
+        if "rtt_mean_ms" in s:
+            line += f", RTT TB {s['rtt_mean_ms']:.1f} ms (p99 {s['rtt_p99_ms']:.1f} ms)"
+        line += f", hiệu chỉnh {self.stats.corrections}"
+        if "max_correction_px" in s:
+            line += f" (lớn nhất {s['max_correction_px']:.1f} px)"
+        return line
+
+async def connect(session, host, port, latency=0.0):
+    # Runs one client connection until the server closes it. latency (seconds) delays every
+    # message in both directions, to try the protocol against a slow link on one machine.
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+
+    def write(payload):
+        if latency:
+            loop.call_later(latency, write_now, frame(payload))
+        else:
+            write_now(frame(payload))
+
+    def write_now(data):
+        # Inputs still in flight when the server hangs up are dropped
+        if not writer.is_closing():
+            writer.write(data)
+
+    session.send = lambda payload: loop.call_soon_threadsafe(write, payload)
+    session.hello()
+    try:
+        while True:
+            message = await read_frame(reader)
+            if latency:
+                loop.call_later(latency, session.receive, message)
+            else:
+                session.receive(message)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        if latency:
+            loop.call_later(latency, session.disconnected)
+        else:
+            session.disconnected()
+        writer.close()
+
+class NetworkThread(threading.Thread):
+    # Runs the connection's event loop next to pygame's loop in Game
+    def __init__(self, session, host, port):
+        super().__init__(name="net-client", daemon=True)
+        self.session = session
+        self.host = host
+        self.port = port
+
+    def run(self):
+        try:
+            asyncio.run(connect(self.session, self.host, self.port))
+        except OSError as error:
+            print(f"Không kết nối được tới {self.host}:{self.port}: {error}")
+            self.session.disconnected()
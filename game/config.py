@@ -1,3 +1,4 @@
+import os
 import pygame
 
 WIDTH, HEIGHT = 1280, 720
@@ -14,10 +15,119 @@ GRAY = (128, 128, 128)
 
 
 PLAYER_SIZE = 50
+# Speeds below are in pixels per tick at this rate; other simulation rates scale by dt
+BASE_TICK_RATE = 60
 PLAYER_SPEED = 12
 INITIAL_HP = 3
 MAX_DIFFICULTY = 10
 
+# Fixed-timestep loop: simulation and render rates are independent
+SIMULATION_HZ = 120
+RENDER_FPS = 60
+MAX_FRAME_TIME = 0.25
+# Render target size relative to WIDTH x HEIGHT; game logic always uses WIDTH x HEIGHT
+RENDER_SCALE = 1.0
+# Hybrid frame pacing sleeps until this many seconds before the deadline, then spins
+PACING_SPIN_MARGIN = 0.002
+# Gameplay keys: left, right, ability (the simulation's input tuple, in this order)
+PLAYER_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)
+
+# Endless mode: waves of ENDLESS_WAVE_DURATION seconds raise spawn rate, speed and enemy mix
+ENDLESS_POOL_SIZE = 512
+ENDLESS_WAVE_DURATION = 20.0
+ENDLESS_START_SPAWN_RATE = 0.6
+ENDLESS_SPAWN_RATE_GROWTH = 1.25
+ENDLESS_MAX_SPAWN_RATE = 40.0
+ENDLESS_WAVES_PER_LEVEL = 1
+ENDLESS_MAX_LEVEL = 20
+ENDLESS_WAVES_PER_UNLOCK = 2
+
+# Scripted dodge policy looks this many pixels above the player
+DODGE_LOOKAHEAD = 160
+
+# Autopilot (game/autopilot.py): lookahead in 60 Hz ticks, cut into slices of the danger map,
+# over columns of AUTOPILOT_COLUMN pixels; enemies further than AUTOPILOT_BAND above the
+# player are not looked at. Decisions over budget make the next plan shorter.
+AUTOPILOT_LOOKAHEAD_TICKS = 60
+AUTOPILOT_SLICE_TICKS = 2
+AUTOPILOT_MIN_SLICES = 8
+AUTOPILOT_COLUMN = 8
+AUTOPILOT_MARGIN = 4
+AUTOPILOT_BAND = 700
+AUTOPILOT_BUDGET_MS = 1.0
+# Shield and Time Warp go off when no path stays clear for this many slices
+AUTOPILOT_PANIC_SLICES = 4
+# Soak runs restart this long after a game over
+AUTOPILOT_RESTART_DELAY = 2.0
+
+# Finished runs are saved here as input replays
+REPLAY_DIR = "replays"
+
+# Local leaderboard (SQLite, written off the frame loop in batches)
+LEADERBOARD_PATH = "leaderboard.db"
+LEADERBOARD_TOP_N = 5
+LEADERBOARD_BATCH_SECONDS = 0.5
+
+# Longest wait for input on a menu that has nothing to redraw (the idle loop's tick)
+MENU_IDLE_MS = 250
+
+# Video capture (game/capture.py): frames per second kept, and frame buffers waiting for
+# the writer thread before new frames are dropped
+CAPTURE_DIR = "captures"
+CAPTURE_FPS = 30
+CAPTURE_RING_SIZE = 8
+
+# Quality governor (game/governor.py): the p90 of each QUALITY_WINDOW frames' work is held
+# against the QUALITY_TARGET_FPS frame time. Above QUALITY_DEGRADE of it the next level down is
+# used; below QUALITY_RESTORE, the previous level comes back.
+QUALITY_TARGET_FPS = 60
+QUALITY_WINDOW = 30
+QUALITY_DEGRADE = 0.9
+QUALITY_RESTORE = 0.5
+QUALITY_MAX_RESTORE_WAIT = 32
+QUALITY_LEVELS = ("đầy đủ", "bớt hiệu ứng", "HUD cập nhật thưa", "sprite đơn giản", "tắt hiệu ứng")
+QUALITY_PARTICLE_BUDGET = 150
+QUALITY_HUD_FRAMES = 10
+
+# Networked matches (game/server.py, game/client.py): snapshots go out every
+# NET_SNAPSHOT_EVERY server ticks, deltas are taken against one of the last
+# NET_SNAPSHOT_HISTORY snapshots, and at most NET_INPUT_BUFFER inputs queue per client
+NET_PORT = 7777
+NET_SNAPSHOT_EVERY = 4
+NET_SNAPSHOT_HISTORY = 32
+NET_INPUT_BUFFER = 8
+NET_COMPRESSION_LEVEL = 6
+# Reconciliation moves the local player by more than this many pixels -> counted as a correction
+NET_CORRECTION_EPSILON = 0.5
+
+# Training environment (game/env.py): simulation ticks per action, episode cap, observation size
+ENV_FRAME_SKIP = 4
+ENV_MAX_SECONDS = 120.0
+ENV_NEAREST_ENEMIES = 8
+ENV_FRAME_SIZE = (84, 84)
+ENV_SURVIVAL_REWARD = 0.01
+ENV_DAMAGE_PENALTY = 5.0
+
+# Particle effects: pool size, most particles drawn per frame (newest win), fade levels.
+# Particle speeds are in px/s and gravity in px/s^2; effects are visual only.
+PARTICLE_CAPACITY = 2048
+PARTICLE_DRAW_BUDGET = 600
+PARTICLE_FADE_STEPS = 8
+PARTICLE_KINDS = {
+    "trail": {"color": (255, 230, 0), "size": 6, "life": 0.35, "speed": (10, 50), "gravity": 0, "lift": 0},
+    "spark": {"color": (255, 120, 80), "size": 5, "life": 0.5, "speed": (80, 200), "gravity": 400, "lift": 120},
+    "ripple": {"color": (200, 100, 255), "size": 6, "life": 0.8, "speed": (220, 240), "gravity": 0, "lift": 0},
+    "hit": {"color": (230, 30, 30), "size": 7, "life": 0.6, "speed": (150, 380), "gravity": 700, "lift": 200},
+}
+# Continuous emitters in particles per second, one-off bursts in particles
+PARTICLE_TRAIL_RATE = 240
+PARTICLE_SPARK_RATE = 120
+PARTICLE_RIPPLE_COUNT = 48
+PARTICLE_HIT_COUNT = 40
+
+# Broad-phase collision grid; cells must be at least as large as an enemy
+GRID_CELL_SIZE = 100
+
 
 ANIMATION_SPEED_MIN = 0.1
 ANIMATION_SPEED_MAX = 0.2
@@ -26,6 +136,17 @@ ANIMATION_SPEED_MAX = 0.2
 PLAYER_TYPES = ["blue", "red", "gray"]
 ENEMY_TYPES = ["blue", "dark", "purple"]
 
+# Sprite sheet frame counts: player sheets are horizontal strips, enemy sheets vertical ones
+PLAYER_FRAME_COUNT = 8
+ENEMY_FRAME_COUNTS = {"blue": 4, "dark": 6, "purple": 6}
+
+# Asset files live next to the game package, wherever the game is started from
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+IMAGE_DIR = os.path.join(ASSET_DIR, "images")
+
+# Pre-scaled sprite atlas built from the sheets above (rebuilt when they change)
+ATLAS_PATH = os.path.join(IMAGE_DIR, "sprites.atlas")
+
 PLAYER_ABILITIES = {
     "blue": {
         "name": "Lightning Dash",
@@ -50,9 +171,29 @@ PLAYER_ABILITIES = {
 }
 
 GROUND_HEIGHT = 80
+
+# Text / HUD caching
+TEXT_CACHE_SIZE = 256
+HUD_HEIGHT = 90
+
+# Dirty-rect rendering falls back to a full flip above this fraction of the screen
+DIRTY_RECT_THRESHOLD = 0.35
+
+# Frame profiler (F3 toggles the overlay, F4 exports a trace)
+PROFILER_CAPACITY = 3600
+PROFILER_GRAPH_FRAMES = 240
+PROFILER_GRAPH_HEIGHT = 80
+PROFILER_OVERLAY_POS = (20, HUD_HEIGHT)
+PROFILE_DIR = "profiles"
 GROUND_COLOR = (139, 69, 19)
 
 
 CLICK_VOLUME = 0.7
 COLLISION_VOLUME = 0.8
-MUSIC_VOLUME = 0.3
\ No newline at end of file
+MUSIC_VOLUME = 0.3
+
+# Reserved mixer channels per sound category
+AUDIO_CHANNELS = {"music": 2, "ui": 2, "sfx": 4}
+MUSIC_CROSSFADE_MS = 600
+# Repeats of an effect closer together than this are merged into the one already playing
+SOUND_MIN_INTERVAL_MS = {"click": 40, "collision": 80}
\ No newline at end of file
@@ -0,0 +1,74 @@
+import pygame
+from .config import *
+
+class DirtyRectRenderer:
+    # Renders the playing state by restoring the static background only under what moved
+    # and presenting just those rects. Falls back to a full flip once the dirty area gets
+    # large enough that per-rect updates stop paying off.
+    def __init__(self, screen, ground, profiler, threshold=DIRTY_RECT_THRESHOLD, view=None):
+        self.screen = screen
+        self.profiler = profiler
+        self.ground = ground
+        self.view = view
+        self.threshold = threshold * screen.get_width() * screen.get_height()
+
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(WHITE)
+        self.ground_area = ground.draw(self.background, view)
+
+        self.previous_rects = []
+        self.full_redraw = True
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def render(self, enemy_manager, player, screen_manager, score, alpha=1.0, wave=None, particles=None,
+               quality=None):
+        screen = self.screen
+        background = self.background
+
+        if self.full_redraw:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                screen.blit(background, rect, rect)
+            # The HUD layer is translucent, so old text must be wiped before it is blitted again
+            hud_area = screen_manager.hud_layer.get_rect()
+            if self.view:
+                hud_area = self.view.rect(hud_area)
+            screen.blit(background, hud_area, hud_area)
+
+        with self.profiler.section("draw_all"):
+            current_rects = enemy_manager.draw_all(screen, self.ground.y, alpha, self.view,
+                                                   quality.sprite_filter() if quality else None)
+        if player:
+            current_rects.append(player.draw(screen, alpha, self.view))
+        if particles:
+            current_rects.extend(particles.draw(screen))
+        
+        # The normal renderer draws the ground over sprites; restore it where they reach into it
+        ground_top = self.ground_area.top
+        for rect in current_rects:
+            if rect.bottom > ground_top:
+                ground_overlap = rect.clip(self.ground_area)
+                screen.blit(background, ground_overlap, ground_overlap)
+
+        hp = player.hp if player else 0
+        with self.profiler.section("draw_hud"):
+            label, refresh = (quality.hud_label(), quality.hud_due()) if quality else (None, True)
+            hud_rect = screen_manager.draw_hud(screen, score, hp, player, wave, self.view, label, refresh)
+
+        dirty = self.previous_rects + current_rects
+        if hud_rect:
+            dirty.append(hud_rect)
+        self.previous_rects = current_rects
+
+        # Returns the rects to present, or None when the whole screen should be flipped
+        if self.full_redraw or sum(rect.w * rect.h for rect in dirty) > self.threshold:
+            self.full_redraw = False
+            self.full_frames += 1
+            return None
+        self.partial_frames += 1
+        return dirty
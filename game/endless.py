@@ -0,0 +1,120 @@
+import random
+from .config import *
+from .game_objects import Enemy, EnemyManager, TICK_DT
+
+class WaveScheduler:
+    # Endless mode pacing: every ENDLESS_WAVE_DURATION seconds a new wave starts, which
+    # spawns faster, rolls faster enemies and unlocks the next selected enemy type.
+    def __init__(self, selected_enemies, start_level=1, rng=random):
+        self.selected_enemies = list(selected_enemies)
+        self.start_level = start_level
+        self.rng = rng
+        self.time = 0.0
+        self.spawn_budget = 0.0
+
+    @property
+    def wave(self):
+        return int(self.time // ENDLESS_WAVE_DURATION) + 1
+
+    @property
+    def level(self):
+        # Feeds the same speed formula as the fixed difficulty levels
+        return min(ENDLESS_MAX_LEVEL, self.start_level + (self.wave - 1) // ENDLESS_WAVES_PER_LEVEL)
+
+    def spawn_rate(self):
+        rate = ENDLESS_START_SPAWN_RATE * ENDLESS_SPAWN_RATE_GROWTH ** (self.wave - 1)
+        return min(ENDLESS_MAX_SPAWN_RATE, rate * self.start_level)
+
+    def enemy_mix(self):
+        unlocked = 1 + (self.wave - 1) // ENDLESS_WAVES_PER_UNLOCK
+        return self.selected_enemies[:unlocked]
+
+    def update(self, dt):
+        # Returns how many enemies should spawn this tick
+        self.time += dt
+        self.spawn_budget += self.spawn_rate() * dt
+        count = int(self.spawn_budget)
+        self.spawn_budget -= count
+        return count
+
+    def next_type(self):
+        return self.rng.choice(self.enemy_mix())
+
+class EndlessEnemyManager(EnemyManager):
+    # Enemies come from a pool of Enemy instances allocated up front; spawning re-initialises
+    # a free one in place and despawning hands it back, so nothing is allocated mid-run.
+    def __init__(self, rng=random, pool_size=ENDLESS_POOL_SIZE):
+        super().__init__(rng)
+        self.pool_size = pool_size
+        self.free = []
+        self.scheduler = None
+        self.enemy_sprites = {}
+        self.speed_modifier = 1.0
+        self.dropped_spawns = 0
+
+    def create_enemies(self, difficulty, selected_enemies, enemy_sprites, num_enemies=None):
+        self.grid.clear()
+        self.enemies = []
+        self.enemy_sprites = enemy_sprites
+        self.speed_modifier = 1.0
+        self.dropped_spawns = 0
+        self.scheduler = WaveScheduler(selected_enemies, difficulty, self.rng)
+
+        enemy_type = selected_enemies[0]
+        size = num_enemies or self.pool_size
+        self.free = [Enemy(0, -PLAYER_SIZE, enemy_type, enemy_sprites.get(enemy_type), difficulty, self.rng)
+                     for _ in range(size)]
+
+    def spawn(self):
+        if not self.free:
+            self.dropped_spawns += 1
+            return
+        enemy = self.free.pop()
+        enemy_type = self.scheduler.next_type()
+        enemy.spawn(
+            self.rng.randint(0, WIDTH - PLAYER_SIZE),
+            self.rng.randint(-200, -50),
+            enemy_type,
+            self.enemy_sprites.get(enemy_type),
+            self.scheduler.level,
+            self.speed_modifier
+        )
+        self.enemies.append(enemy)
+        self.grid.insert(enemy)
+
+    def despawn(self, index):
+        enemies = self.enemies
+        enemy = enemies[index]
+        enemies[index] = enemies[-1]
+        enemies.pop()
+        self.grid.remove(enemy)
+        self.free.append(enemy)
+
+    def update_enemies(self, difficulty, dt=TICK_DT):
+        for _ in range(self.scheduler.update(dt)):
+            self.spawn()
+
+        score_gained = 0
+        enemies = self.enemies
+        # Walk backwards so swap-removal never skips an enemy
+        for index in range(len(enemies) - 1, -1, -1):
+            enemy = enemies[index]
+            enemy.update(dt)
+            if enemy.is_off_screen():
+                self.despawn(index)
+                score_gained += 1
+            else:
+                self.grid.update(enemy)
+
+        return score_gained
+
+    def check_collisions(self, player):
+        enemy = self.first_hit(player)
+        if enemy:
+            self.despawn(self.enemies.index(enemy))
+            return True
+        return False
+
+    def set_all_speed_modifier(self, modifier):
+        self.speed_modifier = modifier
+        super().set_all_speed_modifier(modifier)
@@ -0,0 +1,147 @@
+import numpy as np
+import pygame
+import random
+from .config import *
+from .game_objects import TICK_DT, pixel_hit
+
+class ArrayEnemyManager:
+    # Same interface as EnemyManager, but every enemy lives in a row of the NumPy arrays
+    # below instead of in its own Enemy object, so each step is a handful of batched ops.
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.np_rng = np.random.default_rng(0)
+        self.types = []
+        self.sprites = []
+        # Enemy type -> collision mask per sprite frame
+        self.masks = {}
+        self.allocate(0)
+
+    def allocate(self, count):
+        self.count = count
+        self.x = np.zeros(count, dtype=np.float64)
+        self.y = np.zeros(count, dtype=np.float64)
+        self.prev_y = np.zeros(count, dtype=np.float64)
+        self.base_speed = np.zeros(count, dtype=np.float64)
+        self.speed = np.zeros(count, dtype=np.float64)
+        self.speed_modifier = np.ones(count, dtype=np.float64)
+        self.animation_speed = np.zeros(count, dtype=np.float64)
+        self.animation_counter = np.zeros(count, dtype=np.float64)
+        self.frame = np.zeros(count, dtype=np.int32)
+        self.num_frames = np.ones(count, dtype=np.int32)
+        self.type_index = np.zeros(count, dtype=np.int32)
+
+    def create_enemies(self, difficulty, selected_enemies, enemy_sprites, num_enemies=None):
+        if num_enemies is None:
+            num_enemies = difficulty * 2
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        rng = self.np_rng
+
+        self.allocate(num_enemies)
+        self.types = list(selected_enemies)
+        self.sprites = [enemy_sprites.get(enemy_type) for enemy_type in self.types]
+
+        self.type_index[:] = rng.integers(0, len(self.types), num_enemies)
+        self.x[:] = rng.integers(0, WIDTH - PLAYER_SIZE + 1, num_enemies)
+        self.y[:] = rng.integers(-800, -49, num_enemies)
+        self.prev_y[:] = self.y
+        self.base_speed[:] = rng.uniform(1 + difficulty * 0.5, 2 + difficulty * 0.8, num_enemies)
+        self.speed[:] = self.base_speed
+        self.animation_speed[:] = rng.uniform(ANIMATION_SPEED_MIN, ANIMATION_SPEED_MAX, num_enemies)
+
+        frame_counts = np.array([ENEMY_FRAME_COUNTS[enemy_type] for enemy_type in self.types], dtype=np.int32)
+        self.num_frames[:] = frame_counts[self.type_index]
+
+    def reset_positions(self, index):
+        n = len(index)
+        self.y[index] = self.np_rng.integers(-200, -49, n)
+        self.x[index] = self.np_rng.integers(0, WIDTH - PLAYER_SIZE + 1, n)
+        self.prev_y[index] = self.y[index]
+
+    def update_enemies(self, difficulty, dt=TICK_DT):
+        ticks = dt * BASE_TICK_RATE
+        np.multiply(self.base_speed, self.speed_modifier, out=self.speed)
+        self.prev_y[:] = self.y
+        self.y += self.speed * ticks
+
+        self.animation_counter += self.animation_speed * self.speed_modifier * ticks
+        advance = self.animation_counter >= 1
+        self.animation_counter[advance] = 0
+        self.frame[advance] = (self.frame[advance] + 1) % self.num_frames[advance]
+
+        off_screen = np.flatnonzero(self.y > HEIGHT)
+        if len(off_screen) == 0:
+            return 0
+
+        self.reset_positions(off_screen)
+        sped_up = off_screen[self.np_rng.random(len(off_screen)) < 0.1]
+        self.speed[sped_up] += 0.1 * difficulty
+        return len(off_screen)
+
+    def query_indices(self, rect):
+        # Sweep-and-prune style: cut down to the rect's horizontal band first, then test x
+        # only on that (usually tiny) subset instead of running four compares over every enemy.
+        band = np.flatnonzero((self.y < rect.bottom) & (self.y > rect.top - PLAYER_SIZE))
+        if len(band) == 0:
+            return band
+        xs = self.x[band]
+        return band[(xs < rect.right) & (xs > rect.left - PLAYER_SIZE)]
+
+    def query(self, rects):
+        hits = [self.query_indices(rect) for rect in rects]
+        if not hits:
+            return np.zeros(0, dtype=np.intp)
+        return np.unique(np.concatenate(hits))
+
+    def first_hit(self, player):
+        # Rect overlaps are rare, so the pixel test runs per candidate in Python
+        for index in self.query_indices(player.rect).tolist():
+            masks = self.masks.get(self.types[self.type_index[index]])
+            if pixel_hit(player, masks, self.frame[index], int(self.x[index]), round(self.y[index])):
+                return index
+        return None
+
+    def check_collisions(self, player):
+        index = self.first_hit(player)
+        if index is None:
+            return False
+        self.reset_positions(np.array([index]))
+        return True
+
+    def draw_all(self, screen, ground_y, alpha=1.0, view=None, simplify=None):
+        y = self.y if alpha >= 1.0 else self.prev_y + (self.y - self.prev_y) * alpha
+        visible = np.flatnonzero((y > -PLAYER_SIZE) & (y < ground_y))
+        if len(visible) == 0:
+            return []
+
+        if view:
+            scale = view.scale
+            size = view.length(PLAYER_SIZE)
+            ground_y = view.point(0, ground_y)[1]
+            xs = np.rint(self.x[visible] * scale).astype(np.int32).tolist()
+            ys = np.rint(y[visible] * scale).astype(np.int32).tolist()
+        else:
+            size = PLAYER_SIZE
+            xs = self.x[visible].astype(np.int32).tolist()
+            ys = np.rint(y[visible]).astype(np.int32).tolist()
+        types = self.type_index[visible].tolist()
+        frames = self.frame[visible].tolist()
+
+        blits = []
+        drawn = []
+        for x, y, type_index, frame in zip(xs, ys, types, frames):
+            visible_height = min(size, ground_y - y)
+            if visible_height <= 0:
+                continue
+            sprites = self.sprites[type_index]
+            if sprites and sprites[frame]:
+                sprite = view.sprite(sprites[frame]) if view else sprites[frame]
+                if simplify:
+                    sprite = simplify(sprite)
+                blits.append((sprite, (x, y), (0, 0, size, visible_height)))
+            else:
+                drawn.append(pygame.draw.rect(screen, RED, (x, y, size, visible_height)))
+        drawn.extend(screen.blits(blits))
+        return drawn
+
+    def set_all_speed_modifier(self, modifier):
+        self.speed_modifier.fill(modifier)
@@ -0,0 +1,180 @@
+import numpy as np
+import pygame
+from .config import *
+from .enemy_array import ArrayEnemyManager
+from .simulation import Simulation
+
+# Reinforcement-learning style wrapper around Simulation: reset() / step(action) returning
+# (observation, reward, done, info). Actions index into ACTIONS; observations are either
+# compact feature vectors or small frame buffers exposed as views of a pygame surface.
+
+ACTIONS = (
+    (False, False, False),  # idle
+    (True, False, False),   # left
+    (False, True, False),   # right
+    (False, False, True),   # ability
+    (True, False, True),    # left + ability
+    (False, True, True),    # right + ability
+)
+
+PLAYER_FEATURES = 5
+ENEMY_FEATURES = 3
+ENEMY_COLORS = {"blue": BLUE, "dark": BLACK, "purple": PURPLE}
+MAX_COOLDOWN = max(ability["cooldown"] for ability in PLAYER_ABILITIES.values())
+
+def feature_size(nearest=ENV_NEAREST_ENEMIES):
+    return PLAYER_FEATURES + nearest * ENEMY_FEATURES
+
+def enemy_state(manager):
+    # x, y and current fall speed of every live enemy, whichever enemy store is in use
+    if isinstance(manager, ArrayEnemyManager):
+        return manager.x, manager.y, manager.base_speed * manager.speed_modifier
+    enemies = manager.enemies
+    x = np.fromiter((enemy.rect.x for enemy in enemies), np.float64, len(enemies))
+    y = np.fromiter((enemy.y for enemy in enemies), np.float64, len(enemies))
+    speed = np.fromiter((enemy.base_speed * enemy.speed_modifier for enemy in enemies), np.float64, len(enemies))
+    return x, y, speed
+
+def write_features(sim, out, nearest=ENV_NEAREST_ENEMIES):
+    player = sim.player
+    out[0] = player.rect.centerx / WIDTH
+    out[1] = player.hp / INITIAL_HP
+    out[2] = max(0.0, player.ability_cooldown) / MAX_COOLDOWN
+    out[3] = 1.0 if player.ability_active else 0.0
+    out[4] = max(0.0, player.ability_duration)
+
+    enemies = out[PLAYER_FEATURES:].reshape(nearest, ENEMY_FEATURES)
+    enemies.fill(0.0)
+    x, y, speed = enemy_state(sim.enemy_manager)
+    if len(x) == 0:
+        return out
+    dx = (x + PLAYER_SIZE / 2 - player.rect.centerx) / WIDTH
+    dy = (player.rect.y - y) / HEIGHT
+    distance = dx * dx + dy * dy
+    # Enemies already below the player cannot hit it any more
+    distance[dy < -PLAYER_SIZE / HEIGHT] = np.inf
+    count = min(nearest, len(x))
+    closest = np.argpartition(distance, count - 1)[:count]
+    closest = closest[np.argsort(distance[closest])]
+    closest = closest[np.isfinite(distance[closest])]
+    enemies[:len(closest), 0] = dx[closest]
+    enemies[:len(closest), 1] = dy[closest]
+    enemies[:len(closest), 2] = speed[closest] / BASE_TICK_RATE
+    return out
+
+def draw_frame(sim, surface):
+    # Flat-shaded, downscaled frame. Uses fill/draw only (no blits), which pygame allows
+    # while a surfarray view keeps the surface locked.
+    scale_x = surface.get_width() / WIDTH
+    scale_y = surface.get_height() / HEIGHT
+    surface.fill(WHITE)
+    manager = sim.enemy_manager
+    if isinstance(manager, ArrayEnemyManager):
+        enemies = zip(manager.x.tolist(), manager.y.tolist(), [manager.types[i] for i in manager.type_index.tolist()])
+    else:
+        enemies = ((enemy.rect.x, enemy.y, enemy.type) for enemy in manager.enemies)
+    size = (max(1, round(PLAYER_SIZE * scale_x)), max(1, round(PLAYER_SIZE * scale_y)))
+    for x, y, enemy_type in enemies:
+        if -PLAYER_SIZE < y < HEIGHT:
+            surface.fill(ENEMY_COLORS.get(enemy_type, RED), ((round(x * scale_x), round(y * scale_y)), size))
+    rect = sim.player.rect
+    surface.fill(GREEN, ((round(rect.x * scale_x), round(rect.y * scale_y)), size))
+
+class DodgerEnv:
+    def __init__(self, player_type="blue", difficulty=1, selected_enemies=None, observation="features",
+                 sim_hz=SIMULATION_HZ, frame_skip=ENV_FRAME_SKIP, max_seconds=ENV_MAX_SECONDS,
+                 nearest=ENV_NEAREST_ENEMIES, frame_size=ENV_FRAME_SIZE, frame_surface=None, **sim_options):
+        self.observation = observation
+        self.dt = 1.0 / sim_hz
+        self.frame_skip = frame_skip
+        self.max_ticks = int(max_seconds * sim_hz)
+        self.nearest = nearest
+        self.sim = Simulation(player_type, difficulty, selected_enemies, **sim_options)
+
+        if observation == "features":
+            self.features = np.zeros(feature_size(nearest), dtype=np.float32)
+        else:
+            self.surface = frame_surface or pygame.Surface(frame_size)
+            # (height, width, 3) view straight onto the surface's pixels
+            self.frame = pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2)
+
+    def observe(self):
+        if self.observation == "features":
+            return write_features(self.sim, self.features, self.nearest)
+        draw_frame(self.sim, self.surface)
+        return self.frame
+
+    def reset(self, seed=None):
+        self.sim.reset(seed)
+        return self.observe()
+
+    def step(self, action):
+        sim = self.sim
+        left, right, ability = ACTIONS[action]
+        score = sim.score
+        hp = sim.player.hp
+        for _ in range(self.frame_skip):
+            sim.step(self.dt, left, right, ability)
+            if sim.game_over:
+                break
+
+        reward = (sim.score - score) + ENV_SURVIVAL_REWARD * self.frame_skip
+        reward -= ENV_DAMAGE_PENALTY * (hp - sim.player.hp)
+        truncated = sim.tick >= self.max_ticks
+        done = sim.game_over or truncated
+        info = {"score": sim.score, "hp": sim.player.hp, "tick": sim.tick, "truncated": truncated and not sim.game_over}
+        return self.observe(), reward, done, info
+
+class VectorDodgerEnv:
+    # Steps N independent games per call. Observations come back as one (N, ...) array that
+    # is reused between calls; games that finish are reset automatically, their final
+    # score and length reported in info["episodes"].
+    def __init__(self, num_envs, observation="features", frame_size=ENV_FRAME_SIZE, seed=0, **env_options):
+        self.num_envs = num_envs
+        self.observation = observation
+        self.next_seed = seed
+
+        if observation == "features":
+            self.envs = [DodgerEnv(observation=observation, **env_options) for _ in range(num_envs)]
+            self.observations = np.zeros((num_envs, len(self.envs[0].features)), dtype=np.float32)
+        else:
+            # All frames live in one tall surface; each game draws into its own slice of it,
+            # so the batched observation is a reshaped view with no per-step copy.
+            width, height = frame_size
+            self.surface = pygame.Surface((width, height * num_envs))
+            self.envs = [DodgerEnv(observation=observation, frame_size=frame_size,
+                                   frame_surface=self.surface.subsurface((0, i * height, width, height)),
+                                   **env_options)
+                         for i in range(num_envs)]
+            pixels = pygame.surfarray.pixels3d(self.surface)
+            self.observations = pixels.reshape(width, num_envs, height, 3).transpose(1, 2, 0, 3)
+
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=np.bool_)
+
+    def seed_for_next_episode(self):
+        self.next_seed += 1
+        return self.next_seed
+
+    def reset(self):
+        for i, env in enumerate(self.envs):
+            self.store(i, env.reset(self.seed_for_next_episode()))
+        return self.observations
+
+    def store(self, i, observation):
+        # Pixel observations are already views of self.observations
+        if self.observation == "features":
+            self.observations[i] = observation
+
+    def step(self, actions):
+        episodes = []
+        for i, env in enumerate(self.envs):
+            observation, reward, done, info = env.step(int(actions[i]))
+            self.rewards[i] = reward
+            self.dones[i] = done
+            if done:
+                episodes.append({"env": i, "score": info["score"], "ticks": info["tick"],
+                                 "truncated": info["truncated"]})
+                observation = env.reset(self.seed_for_next_episode())
+            self.store(i, observation)
+        return self.observations, self.rewards, self.dones, {"episodes": episodes}
@@ -1,76 +1,314 @@
+import os
 import pygame
 import sys
+import time
 from .config import *
 from .assets import AssetManager
-from .game_objects import Player, EnemyManager, Ground
+from .audio import AudioManager
 from .screens import ScreenManager
+from .simulation import Simulation
+from .dirty_rects import DirtyRectRenderer
+from .profiler import FrameProfiler
+from .replay import InputRecorder
+from .pacing import FramePacer, LatencyMonitor
+from .viewport import Viewport
+from .particles import ParticleSystem
+from .leaderboard import Leaderboard
+from .client import NetSession, NetworkThread
+from .capture import FrameCapture, capture_path
+from .startup import StartupTimer, AssetLoader
+from .autopilot import Autopilot
+from .governor import QualityGovernor
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
+    def __init__(self, enemy_count=None, dirty_rects=False, simulation_hz=SIMULATION_HZ, render_fps=RENDER_FPS,
+                 profile=False, profile_out=None, record_replays=True, pacing="sleep", late_input=False,
+                 latency_report=False, render_scale=RENDER_SCALE, output="scaled", resizable=False,
+                 fullscreen=False, leaderboard_path=LEADERBOARD_PATH, connect=None, capture=None,
+                 capture_fps=CAPTURE_FPS, startup_report=False, started=None, autopilot=False, difficulty=1,
+                 governor=True):
+        # Staged startup: only what the start screen needs is loaded before the first frame
+        self.startup = StartupTimer(started)
+        self.startup_report = startup_report
+        if started is not None:
+            self.startup.record("imports", started)
+        with self.startup.phase("pygame init"):
+            # Audio is opened on the asset loader thread
+            pygame.display.init()
+            pygame.font.init()
         
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Pokemon Dodger")
+        # Below scale 1.0 everything is drawn into a smaller target that is upscaled on
+        # present: by SDL's renderer ("scaled") or by a software scaling blit ("blit")
+        self.view = Viewport(render_scale) if render_scale != 1.0 else None
+        self.output = output
+        self.resizable = resizable
+        self.fullscreen = fullscreen
+        with self.startup.phase("display"):
+            self.create_display(pacing)
+            pygame.display.set_caption("Pokemon Dodger")
         self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(self.clock, pacing, render_fps)
+        # Late input: the pacing wait moves to the top of the frame, so events and key state are
+        # read right after it and just before the simulation steps
+        self.late_input = late_input
+        self.latency = LatencyMonitor()
+        # When handle_events first saw a gameplay key change that no input sample has taken yet
+        self.key_event_at = None
+        self.latency_report = latency_report
         
-        self.assets = AssetManager()
+        with self.startup.phase("fonts + logo"):
+            self.assets = AssetManager(deferred=True)
+        self.audio = AudioManager(self.assets)
+        self.loader = AssetLoader(self.assets, self.audio, self.startup)
+        self.loader.start()
         
         self.screen_manager = ScreenManager(self.assets)
-        
-        self.enemy_manager = EnemyManager()
-        
-        self.ground = Ground()
+        self.screen_manager.difficulty_level = difficulty
         
         self.game_state = "start"
         self.selected_player = "blue"
         self.selected_enemies = ENEMY_TYPES.copy()
-        self.score = 0
-        self.current_music = None
+        self.player_input = (False, False, False)
+        # Stress mode: a fixed enemy count backed by the NumPy enemy store
+        self.enemy_count = enemy_count
+        
+        self.simulation_hz = simulation_hz
+        self.step_dt = 1.0 / simulation_hz
+        self.render_fps = render_fps
+        
+        self.profiler = FrameProfiler(render_fps=render_fps)
+        # Steps drawing quality down when playing frames run over budget, and back up after
+        self.governor = QualityGovernor(enabled=governor)
+        # How long the last present() took; with vsync that's mostly waiting, not work
+        self.present_time = 0.0
+        self.profile_out = profile_out
+        if profile or profile_out:
+            self.profiler.start_recording()
+        
+        self.use_dirty_rects = dirty_rects
+        self.dirty_renderer = None
+        self.rendered_state = None
+        # Key of the menu screen currently on the display; None forces the next menu frame
+        self.presented_menu = None
+        # Event that ended an idle wait, handled first on the next frame
+        self.idle_event = None
+        
+        self.simulation = None
+        self.particles = None
+        self.record_replays = record_replays
+        self.recorder = None
+        
+        with self.startup.phase("leaderboard"):
+            self.leaderboard = Leaderboard(leaderboard_path) if leaderboard_path else None
+        self.last_run = None
+        
+        # Networked play: (host, port) of a game/server.py match to join instead of a local run
+        self.connect = connect
+        self.net = None
+        
+        # Video capture: F9 starts/stops a clip; with capture set ("raw" or "png") every run is recorded
+        self.capture_format = capture
+        self.capture_fps = capture_fps
+        self.capture = None
+        
+        # Soak runs: the autopilot plays instead of the keyboard and starts a new run (with the
+        # next character) AUTOPILOT_RESTART_DELAY after each game over
+        self.autopilot = Autopilot() if autopilot else None
+        self.autopilot_runs = 0
+        self.game_over_at = None
+    
+    def create_display(self, pacing):
+        size = self.view.size if self.view else (WIDTH, HEIGHT)
+        flags = pygame.RESIZABLE if self.resizable else 0
+        if self.fullscreen:
+            flags |= pygame.FULLSCREEN
+        
+        if self.output == "blit":
+            # The window keeps the logical size; present() scales the render target into it
+            self.display = pygame.display.set_mode((WIDTH, HEIGHT), flags)
+            self.screen = pygame.Surface(size).convert()
+            self.letterbox = None
+        else:
+            self.create_scaled_display(size, flags, pacing)
+            if self.display.get_size() != size:
+                # No renderer and the window came back at another size: scale in software instead
+                self.output = "blit"
+                self.screen = pygame.Surface(size).convert()
+                self.letterbox = None
         
-        self.player = None
+        # Menus are laid out in logical coordinates; with a scaled target they are drawn
+        # here first and resampled down
+        self.canvas = pygame.Surface((WIDTH, HEIGHT)).convert() if self.view else None
+    
+    def create_scaled_display(self, size, flags, pacing):
+        # SCALED keeps the surface at `size` whatever the window does. SDL also only honours
+        # vsync for renderer-backed displays like this one.
+        if self.view or flags or pacing == "vsync":
+            flags |= pygame.SCALED
+        try:
+            self.display = pygame.display.set_mode(size, flags, vsync=1 if pacing == "vsync" else 0)
+        except pygame.error as error:
+            # vsync, fullscreen or the renderer itself may be unavailable (headless drivers have none)
+            print(f"Không mở được cửa sổ như yêu cầu ({error}), dùng cửa sổ thường")
+            self.display = pygame.display.set_mode(size)
+        self.screen = self.display
+    
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        self.presented_menu = None
+        if self.output != "blit":
+            try:
+                pygame.display.toggle_fullscreen()
+                if self.dirty_renderer:
+                    self.dirty_renderer.invalidate()
+                return
+            except pygame.error:
+                pass
+        # Not every video driver can switch in place; re-create the window instead
+        self.create_display(self.pacer.mode)
+        if self.dirty_renderer:
+            self.create_dirty_renderer()
     
-    def play_background_music(self, music_type):
-        music_path = self.assets.music_paths[music_type]
-        if self.current_music != music_path:
-            if self.assets.load_music(music_path):
-                pygame.mixer.music.play(-1)
-                self.current_music = music_path
+    @property
+    def player(self):
+        return self.simulation.player if self.simulation else None
     
-    def play_sound_effect(self, sound_name):
-        sound = self.assets.sounds.get(sound_name)
-        if sound:
-            sound.play()
+    @property
+    def score(self):
+        return self.simulation.score if self.simulation else 0
+    
+    def update_music(self):
+        self.audio.play_music('playing' if self.game_state == "playing" else 'menu')
+    
+    def play_sound_effect(self, sound_name, category="ui"):
+        self.audio.play_sound(sound_name, category)
+    
+    def reset_input(self):
+        # A new run starts from released keys; menu keypresses never count towards its latency
+        self.player_input = (False, False, False)
+        self.key_event_at = None
     
     def reset_game(self):
-        self.score = 0
-        
-        self.player = Player(
-            WIDTH // 2 - PLAYER_SIZE // 2,
-            HEIGHT - GROUND_HEIGHT - PLAYER_SIZE,
-            self.assets.player_sprites[self.selected_player],
-            self.selected_player
-        )
-        
-        self.enemy_manager.create_enemies(
+        self.loader.wait()
+        self.net = None
+        self.reset_input()
+        self.step_dt = 1.0 / self.simulation_hz
+        self.simulation = Simulation(
+            self.selected_player,
             self.screen_manager.difficulty_level,
             self.selected_enemies,
-            self.assets.enemy_sprites
+            player_sprites=self.assets.player_sprites[self.selected_player],
+            enemy_sprites=self.assets.enemy_sprites,
+            enemy_count=self.enemy_count,
+            array_enemies=self.enemy_count is not None,
+            endless=self.screen_manager.endless_mode,
+            masks=(self.assets.player_masks, self.assets.enemy_masks)
         )
+        
+        self.particles = ParticleSystem(view=self.view)
+        
+        if self.record_replays:
+            self.recorder = InputRecorder(self.simulation, self.simulation_hz)
+        
+        if self.use_dirty_rects:
+            self.create_dirty_renderer()
+        
+        if self.capture_format:
+            self.start_capture()
+    
+    def join_match(self):
+        self.net = NetSession(self.selected_player, self.assets.player_sprites, self.assets.enemy_sprites)
+        NetworkThread(self.net, *self.connect).start()
+        self.reset_input()
+        self.game_state = "connecting"
+    
+    def poll_match(self):
+        # Waits in the "connecting" state until the server sends the first snapshot
+        self.net.step()
+        if self.net.started:
+            self.simulation = self.net
+            self.step_dt = self.net.dt
+            self.particles = ParticleSystem(view=self.view)
+            self.recorder = None
+            self.dirty_renderer = None
+            self.game_state = "playing"
+        elif self.net.game_over:
+            self.net = None
+            self.game_state = "start"
+    
+    def drive_menus(self):
+        if self.game_state == "start" and not self.autopilot_runs and self.loader.ready():
+            self.start_autopilot_run()
+        elif self.game_state == "game_over" and time.perf_counter() - self.game_over_at >= AUTOPILOT_RESTART_DELAY:
+            self.start_autopilot_run()
+    
+    def start_autopilot_run(self):
+        self.selected_player = PLAYER_TYPES[self.autopilot_runs % len(PLAYER_TYPES)]
+        self.autopilot_runs += 1
+        if self.connect:
+            self.join_match()
+        else:
+            self.game_state = "playing"
+            self.reset_game()
+    
+    def start_capture(self):
+        self.stop_capture()
+        self.capture = FrameCapture(self.screen, capture_path(), self.capture_format or "raw", self.capture_fps)
+    
+    def stop_capture(self):
+        if self.capture:
+            print(self.capture.close().report())
+            self.capture = None
+    
+    def create_dirty_renderer(self):
+        self.dirty_renderer = DirtyRectRenderer(self.screen, self.simulation.ground, self.profiler, view=self.view)
     
     def handle_events(self):
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if self.idle_event:
+            events.insert(0, self.idle_event)
+            self.idle_event = None
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in PLAYER_KEYS:
+                if self.game_state == "playing" and self.key_event_at is None:
+                    self.key_event_at = time.perf_counter()
             if event.type == pygame.KEYDOWN:
                 self.handle_keydown(event.key)
+            elif event.type == pygame.VIDEORESIZE:
+                self.letterbox = None
+                self.presented_menu = None
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.presented_menu = None
         
         return True
     
     def handle_keydown(self, key):
+        if key == pygame.K_F3:
+            self.profiler.toggle()
+            self.presented_menu = None
+            if self.dirty_renderer:
+                self.dirty_renderer.invalidate()
+            return
+        if key == pygame.K_F4:
+            self.export_profile()
+            return
+        if key == pygame.K_F11:
+            self.toggle_fullscreen()
+            return
+        if key == pygame.K_F9:
+            if self.capture:
+                self.stop_capture()
+            else:
+                self.start_capture()
+            return
+        
         if self.game_state == "start":
             if key == pygame.K_RETURN:
+                # Player selection draws the sprites
+                self.loader.wait()
                 self.play_sound_effect('click')
                 self.game_state = "select_player"
         
@@ -82,10 +320,14 @@ class Game:
                     self.selected_player = new_player
             elif key == pygame.K_RETURN:
                 self.play_sound_effect('click')
-                self.game_state = "select_difficulty"
+                if self.connect:
+                    # The server picks difficulty and enemies for everyone
+                    self.join_match()
+                else:
+                    self.game_state = "select_difficulty"
         
         elif self.game_state == "select_difficulty":
-            if key in [pygame.K_LEFT, pygame.K_RIGHT]:
+            if key in [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_e]:
                 self.play_sound_effect('click')
                 self.screen_manager.handle_difficulty_selection_input(key)
             elif key == pygame.K_RETURN:
@@ -98,86 +340,268 @@ class Game:
                 self.play_sound_effect('click')
                 self.game_state = "start"
     
+    def export_profile(self, path=None):
+        if path is None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, time.strftime("frame_profile_%Y%m%d_%H%M%S.json"))
+        self.profiler.export(path)
+        print(f"Đã lưu profile khung hình: {path}")
+    
     def handle_player_input(self):
         if self.game_state != "playing" or not self.player:
+            self.key_event_at = None
             return
         
-        keys = pygame.key.get_pressed()
-        
-        if keys[pygame.K_LEFT]:
-            self.player.move_left()
-        elif keys[pygame.K_RIGHT]:
-            self.player.move_right(WIDTH)
-        else:
-            self.player.stop()
+        if self.autopilot:
+            self.player_input = self.autopilot(self.simulation)
+            return
         
-        if keys[pygame.K_SPACE]:
-            if self.player.use_ability():
-                self.play_sound_effect('click')
+        keys = pygame.key.get_pressed()
+        player_input = tuple(keys[key] for key in PLAYER_KEYS)
+        if player_input != self.player_input:
+            # Latency counts from the key event, so it includes any time spent before the sample
+            self.latency.input_changed(self.key_event_at or time.perf_counter())
+        self.key_event_at = None
+        self.player_input = player_input
     
-    def update_game(self):
+    def update_game(self, dt):
         if self.game_state != "playing":
             return
         
-        dt = self.clock.get_time() / 1000.0
-        self.player.update_abilities(dt)
+        if self.recorder:
+            self.recorder.record(*self.player_input)
+        events = self.simulation.step(dt, *self.player_input)
+        self.emit_effects(events, dt)
         
-        if self.player.player_type == "gray" and self.player.ability_active:
-            self.enemy_manager.set_all_speed_modifier(0.3)
-        else:
-            self.enemy_manager.set_all_speed_modifier(1.0)
-        
-        score_gained = self.enemy_manager.update_enemies(self.screen_manager.difficulty_level)
-        self.score += score_gained
+        if "ability" in events:
+            self.play_sound_effect('click')
+        if "collision" in events:
+            self.play_sound_effect('collision', "sfx")
+        if "game_over" in events:
+            self.game_state = "game_over"
+            self.game_over_at = time.perf_counter()
+            if self.autopilot:
+                print(f"Autopilot ván {self.autopilot_runs} ({self.selected_player}): "
+                      f"{self.simulation.time:.1f}s, điểm {self.score}")
+            self.save_replay()
+            if self.capture_format:
+                self.stop_capture()
+            if self.leaderboard and not self.net and not self.autopilot:
+                self.last_run = self.leaderboard.record(self.simulation)
+    
+    def emit_effects(self, events, dt):
+        player = self.player
+        particles = self.particles
+        x, y = player.rect.center
         
-        if self.enemy_manager.check_collisions(self.player):
-            self.play_sound_effect('collision')
-            if self.player.take_damage():
-                self.game_state = "game_over"
+        if not self.governor.emit_effects():
+            # Degraded: nothing new, what is already out fades away
+            particles.update(dt)
+            return
+        if "collision" in events:
+            particles.emit("hit", x, y, PARTICLE_HIT_COUNT, PLAYER_SIZE / 4)
+        if player.ability_active:
+            if player.player_type == "blue":
+                particles.emit_rate("trail", x, y, PARTICLE_TRAIL_RATE, dt, PLAYER_SIZE / 3)
+            elif player.player_type == "red":
+                particles.emit_rate("spark", x, y, PARTICLE_SPARK_RATE, dt, PLAYER_SIZE * 0.6)
+            elif player.player_type == "gray" and "ability" in events:
+                particles.emit("ripple", x, y, PARTICLE_RIPPLE_COUNT, PLAYER_SIZE / 2, ring=True)
+        particles.update(dt)
     
-    def render(self):
-        self.screen.fill(WHITE)
+    def save_replay(self):
+        if self.recorder:
+            print(f"Đã lưu replay: {self.recorder.save()}")
+            self.recorder = None
+    
+    def render(self, alpha=1.0):
+        # alpha: how far the current frame is between the last two simulation ticks.
+        # Returns False when nothing needed drawing (a menu that is already on screen).
+        if self.game_state != "playing":
+            self.rendered_state = self.game_state
+            if not self.render_menu():
+                return False
+            self.present()
+            return True
+        self.presented_menu = None
+        governor = self.governor
+        self.particles.draw_budget = governor.particle_budget()
         
-        if self.game_state == "start":
-            self.play_background_music('menu')
-            self.screen_manager.draw_start_screen(self.screen)
+        if self.dirty_renderer:
+            if self.rendered_state != "playing" or self.profiler.overlay_visible:
+                self.dirty_renderer.invalidate()
+            self.rendered_state = self.game_state
+            dirty = self.dirty_renderer.render(self.simulation.enemy_manager, self.player, self.screen_manager,
+                                               self.score, alpha, self.simulation.wave, self.particles, governor)
+            self.present(dirty)
+            return True
+        self.rendered_state = self.game_state
         
-        elif self.game_state == "select_player":
-            self.play_background_music('menu')
-            self.screen_manager.draw_player_selection(self.screen)
+        self.screen.fill(WHITE)
+        # Remote enemies and players only move when a snapshot arrives
+        remote_alpha = self.net.interpolation(alpha) if self.net else alpha
+        with self.profiler.section("draw_all"):
+            self.simulation.enemy_manager.draw_all(self.screen, self.simulation.ground.y, remote_alpha, self.view,
+                                                   governor.sprite_filter())
         
-        elif self.game_state == "select_difficulty":
-            self.play_background_music('menu')
-            self.screen_manager.draw_difficulty_selection(self.screen)
+        if self.net:
+            for other in self.net.others.values():
+                if other.hp > 0:
+                    other.draw(self.screen, remote_alpha, self.view)
+        if self.player:
+            self.player.draw(self.screen, alpha, self.view)
+        self.particles.draw(self.screen)
         
-        elif self.game_state == "playing":
-            self.play_background_music('playing')
-            
-            self.enemy_manager.draw_all(self.screen, self.ground.y)
-            
-            if self.player:
-                self.player.draw(self.screen)
-            
-            self.ground.draw(self.screen)
-            
-            hp = self.player.hp if self.player else 0
-            self.screen_manager.draw_hud(self.screen, self.score, hp, self.player)
+        self.simulation.ground.draw(self.screen, self.view)
         
-        elif self.game_state == "game_over":
-            self.play_background_music('menu')
-            self.screen_manager.draw_game_over(self.screen, self.score)
+        hp = self.player.hp if self.player else 0
+        with self.profiler.section("draw_hud"):
+            self.screen_manager.draw_hud(self.screen, self.score, hp, self.player, self.simulation.wave, self.view,
+                                         governor.hud_label(), governor.hud_due())
         
-        pygame.display.flip()
+        self.present()
+        return True
+    
+    def menu_args(self):
+        if self.game_state == "connecting":
+            return ("%s:%d" % self.connect,)
+        if self.game_state == "game_over":
+            top = self.leaderboard.top_scores(self.simulation.difficulty, self.simulation.endless) \
+                if self.leaderboard and self.simulation and not self.net else None
+            return self.score, self.last_run, top
+        return ()
+    
+    def render_menu(self):
+        # Menus only change on input: each screen comes from ScreenManager's cache, and
+        # nothing is drawn or presented while the one on the display is still current
+        args = self.menu_args()
+        key = self.screen_manager.menu_key(self.game_state, args)
+        if key == self.presented_menu and not self.profiler.overlay_visible:
+            return False
+        self.presented_menu = key
+        
+        screen = self.canvas or self.screen
+        self.screen_manager.draw_menu(screen, self.game_state, *args)
+        if self.canvas:
+            pygame.transform.smoothscale(self.canvas, self.screen.get_size(), self.screen)
+        return True
+    
+    def present(self, dirty=None):
+        if self.capture:
+            # Taken before the profiler overlay goes on
+            self.capture.grab(self.screen)
+        self.profiler.draw_overlay(self.screen, self.assets.fonts['small'])
+        started = time.perf_counter()
+        with self.profiler.section("present"):
+            if self.output == "blit":
+                self.scale_to_window()
+                pygame.display.flip()
+            elif dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+        now = time.perf_counter()
+        self.present_time = now - started
+        self.latency.presented(now)
+        if self.startup.first_frame is None:
+            self.startup.frame_presented()
+    
+    def measure_frame(self, frame_start):
+        # Work that went into a playing frame; under vsync, flip() blocking is waiting, not load
+        work = time.perf_counter() - frame_start
+        if self.pacer.mode == "vsync":
+            work -= self.present_time
+        self.governor.frame(work)
+    
+    def wait_idle(self):
+        # A menu with nothing to redraw: sleep in SDL until an event arrives (or MENU_IDLE_MS
+        # passes, so music and the startup report still get looked at) instead of ticking
+        event = pygame.event.wait(MENU_IDLE_MS)
+        if event.type != pygame.NOEVENT:
+            self.idle_event = event
+    
+    def scale_to_window(self):
+        # Largest rect of the render target's aspect ratio that fits the window, black bars around it
+        if self.letterbox is None:
+            self.display.fill(BLACK)
+            self.letterbox = self.screen.get_rect().fit(self.display.get_rect())
+        pygame.transform.scale(self.screen, self.letterbox.size, self.display.subsurface(self.letterbox))
     
     def run(self):
+        # Fixed-timestep loop: the simulation always advances in step_dt ticks, however many
+        # fit in the elapsed time, and rendering interpolates between the last two ticks.
         running = True
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+        
+        profiler = self.profiler
+        paced = False
         
         while running:
-            running = self.handle_events()
-            self.handle_player_input()
-            self.update_game()
-            self.render()
-            self.clock.tick(60)
+            if paced:
+                # Late input: the previous frame's pacing wait, taken here so events and keys
+                # are read right after it and just before the simulation steps
+                self.pacer.wait()
+                paced = False
+            frame_start = time.perf_counter()
+            profiler.begin_frame()
+            with profiler.section("events"):
+                running = self.handle_events()
+            if not self.late_input:
+                with profiler.section("input"):
+                    self.handle_player_input()
+            self.update_music()
+            if self.late_input:
+                with profiler.section("input"):
+                    self.handle_player_input()
+            
+            # Taken after input so the ticks stepped below cover time up to the sample
+            now = time.perf_counter()
+            accumulator += min(now - previous_time, MAX_FRAME_TIME)
+            previous_time = now
+            
+            if self.autopilot:
+                self.drive_menus()
+            if self.game_state == "connecting":
+                self.poll_match()
+            if self.game_state != "playing":
+                accumulator = 0.0
+            with profiler.section("update"):
+                while accumulator >= self.step_dt:
+                    self.update_game(self.step_dt)
+                    accumulator -= self.step_dt
+            
+            with profiler.section("render"):
+                presented = self.render(accumulator / self.step_dt if self.game_state == "playing" else 1.0)
+            profiler.end_frame()
+            if presented and self.game_state == "playing":
+                self.measure_frame(frame_start)
+            if self.startup_report and self.startup.complete():
+                print(self.startup.report())
+                self.startup_report = False
+            if not presented and self.game_state != "connecting":
+                self.wait_idle()
+            elif self.late_input:
+                paced = True
+            else:
+                self.pacer.wait()
+        
+        if self.game_state == "playing":
+            self.save_replay()
+        self.stop_capture()
+        if self.leaderboard:
+            self.leaderboard.close()
+        if self.net:
+            print(self.net.report())
+        if self.autopilot:
+            print(self.autopilot.report())
+        if self.governor.changes:
+            print(self.governor.report())
+        if self.profile_out:
+            self.export_profile(self.profile_out)
+        if self.latency_report:
+            print(f"Nhịp khung hình: {self.pacer.mode}, đọc phím muộn: {'bật' if self.late_input else 'tắt'}")
+            print(self.latency.report())
         
         pygame.quit()
         sys.exit()
\ No newline at end of file
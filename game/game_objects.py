@@ -1,21 +1,43 @@
 import pygame
 import random
 from .config import *
+from .spatial import SpatialGrid
 
 class Ground:
     def __init__(self):
         self.y = HEIGHT - GROUND_HEIGHT
         self.rect = pygame.Rect(0, self.y, WIDTH, GROUND_HEIGHT)
     
-    def draw(self, screen):
-        pygame.draw.rect(screen, GROUND_COLOR, self.rect)
-        pygame.draw.line(screen, (100, 50, 10), (0, self.y), (WIDTH, self.y), 3)
+    def draw(self, screen, view=None):
+        if view:
+            rect = view.rect(self.rect)
+            drawn = pygame.draw.rect(screen, GROUND_COLOR, rect)
+            line = pygame.draw.line(screen, (100, 50, 10), (0, rect.y), (rect.right, rect.y), view.length(3))
+            return drawn.union(line)
+        drawn = pygame.draw.rect(screen, GROUND_COLOR, self.rect)
+        return drawn.union(pygame.draw.line(screen, (100, 50, 10), (0, self.y), (WIDTH, self.y), 3))
+
+TICK_DT = 1.0 / BASE_TICK_RATE
+
+def pixel_hit(player, enemy_masks, frame, x, y):
+    # Narrow phase for an enemy whose rect already overlaps the player's: the opaque pixels
+    # of both current frames must touch. Without a mask on either side the rects decide.
+    player_mask = player.mask()
+    enemy_mask = enemy_masks[frame] if enemy_masks else None
+    if player_mask is None or enemy_mask is None:
+        return True
+    return player_mask.overlap(enemy_mask, (x - player.rect.x, y - player.rect.y)) is not None
 
 class Player:
-    def __init__(self, x, y, sprites, player_type="blue"):
+    def __init__(self, x, y, sprites, player_type="blue", masks=None):
         self.rect = pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE)
+        # Sub-pixel position, plus the previous tick's one for render interpolation
+        self.x = float(x)
+        self.prev_x = self.x
         self.speed = PLAYER_SPEED
         self.sprites = sprites
+        # Collision mask per sprite frame
+        self.masks = masks
         self.hp = INITIAL_HP
         self.direction = "idle"  # "idle", "left", "right"
         self.player_type = player_type
@@ -27,16 +49,31 @@ class Player:
         self.invulnerable = False
         self.dash_speed_modifier = 1.0
     
-    def move_left(self):
+    def store_previous_position(self):
+        self.prev_x = self.x
+    
+    def frame_index(self):
+        if self.direction == "left":
+            return 6
+        if self.direction == "right":
+            return 7
+        return 0
+    
+    def mask(self):
+        return self.masks[self.frame_index()] if self.masks else None
+    
+    def move_left(self, dt=TICK_DT):
         if self.rect.left > 0:
             effective_speed = self.speed * self.dash_speed_modifier
-            self.rect.x -= effective_speed
+            self.x -= effective_speed * dt * BASE_TICK_RATE
+            self.rect.x = round(self.x)
             self.direction = "left"
     
-    def move_right(self, screen_width):
+    def move_right(self, screen_width, dt=TICK_DT):
         if self.rect.right < screen_width:
             effective_speed = self.speed * self.dash_speed_modifier
-            self.rect.x += effective_speed
+            self.x += effective_speed * dt * BASE_TICK_RATE
+            self.rect.x = round(self.x)
             self.direction = "right"
     
     def stop(self):
@@ -44,6 +81,7 @@ class Player:
     
     def reset_position(self):
         self.rect.x = WIDTH // 2 - PLAYER_SIZE // 2
+        self.x = self.prev_x = float(self.rect.x)
         self.rect.y = HEIGHT - GROUND_HEIGHT - PLAYER_SIZE
         self.hp = INITIAL_HP
         self.ability_cooldown = 0.0
@@ -101,21 +139,24 @@ class Player:
         self.invulnerable = False
         self.dash_speed_modifier = 1.0
     
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0, view=None):
+        rect = self.rect
+        if alpha < 1.0 and self.prev_x != self.x:
+            rect = rect.move(round(self.prev_x + (self.x - self.prev_x) * alpha) - rect.x, 0)
+        logical_rect = rect
+        if view:
+            rect = view.rect(rect)
+        
         if self.sprites and any(self.sprites):
-            frame_index = 0
-            
-            if self.direction == "left":
-                frame_index = 6
-            elif self.direction == "right":
-                frame_index = 7
+            frame_index = self.frame_index()
             
             if self.sprites[frame_index]:
-                screen.blit(self.sprites[frame_index], self.rect)
+                sprite = view.sprite(self.sprites[frame_index]) if view else self.sprites[frame_index]
+                drawn = screen.blit(sprite, rect)
             else:
-                pygame.draw.rect(screen, BLUE, self.rect)
+                drawn = pygame.draw.rect(screen, BLUE, rect)
         else:
-            pygame.draw.rect(screen, BLUE, self.rect)
+            drawn = pygame.draw.rect(screen, BLUE, rect)
         
         if self.ability_active:
             effect_color = None
@@ -127,29 +168,49 @@ class Player:
                 effect_color = (200, 100, 255, 100)
             
             if effect_color:
-                glow_rect = pygame.Rect(self.rect.x - 5, self.rect.y - 5, 
-                                      self.rect.width + 10, self.rect.height + 10)
-                pygame.draw.rect(screen, effect_color[:3], glow_rect, 3)
+                glow_rect = pygame.Rect(logical_rect.x - 5, logical_rect.y - 5, 
+                                      logical_rect.width + 10, logical_rect.height + 10)
+                if view:
+                    glow = pygame.draw.rect(screen, effect_color[:3], view.rect(glow_rect), view.length(3))
+                else:
+                    glow = pygame.draw.rect(screen, effect_color[:3], glow_rect, 3)
+                drawn = drawn.union(glow)
+        
+        return drawn
 
 class Enemy:
-    def __init__(self, x, y, enemy_type, sprites, difficulty):
+    __slots__ = ("rect", "y", "prev_y", "type", "sprites", "rng", "base_speed", "speed", "speed_modifier",
+                 "num_frames", "frame", "animation_speed", "animation_counter")
+    
+    def __init__(self, x, y, enemy_type, sprites, difficulty, rng=random):
         self.rect = pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE)
+        self.rng = rng
+        self.spawn(x, y, enemy_type, sprites, difficulty)
+    
+    def spawn(self, x, y, enemy_type, sprites, difficulty, speed_modifier=1.0):
+        # Re-initialises the enemy in place so pooled instances can be reused
+        self.rect.x = x
+        self.rect.y = y
+        self.y = self.prev_y = float(y)
         self.type = enemy_type
         self.sprites = sprites
-        self.base_speed = random.uniform(1 + difficulty * 0.5, 2 + difficulty * 0.8)
+        self.base_speed = self.rng.uniform(1 + difficulty * 0.5, 2 + difficulty * 0.8)
         self.speed = self.base_speed
-        self.speed_modifier = 1.0
+        self.speed_modifier = speed_modifier
         
-        self.num_frames = 4 if enemy_type == "blue" else 6
+        self.num_frames = ENEMY_FRAME_COUNTS[enemy_type]
         self.frame = 0
-        self.animation_speed = random.uniform(ANIMATION_SPEED_MIN, ANIMATION_SPEED_MAX)
+        self.animation_speed = self.rng.uniform(ANIMATION_SPEED_MIN, ANIMATION_SPEED_MAX)
         self.animation_counter = 0
     
-    def update(self):
+    def update(self, dt=TICK_DT):
+        ticks = dt * BASE_TICK_RATE
         self.speed = self.base_speed * self.speed_modifier
-        self.rect.y += self.speed
+        self.prev_y = self.y
+        self.y += self.speed * ticks
+        self.rect.y = round(self.y)
         
-        self.animation_counter += self.animation_speed * self.speed_modifier
+        self.animation_counter += self.animation_speed * self.speed_modifier * ticks
         if self.animation_counter >= 1:
             self.animation_counter = 0
             self.frame = (self.frame + 1) % self.num_frames
@@ -158,71 +219,120 @@ class Enemy:
         self.speed_modifier = modifier
     
     def reset_position(self):
-        self.rect.y = random.randint(-200, -50)
-        self.rect.x = random.randint(0, WIDTH - PLAYER_SIZE)
+        self.rect.y = self.rng.randint(-200, -50)
+        self.rect.x = self.rng.randint(0, WIDTH - PLAYER_SIZE)
+        self.y = self.prev_y = float(self.rect.y)
     
     def is_off_screen(self):
         return self.rect.y > HEIGHT
     
     def increase_speed(self, difficulty):
-        if random.random() < 0.1:
+        if self.rng.random() < 0.1:
             self.speed += 0.1 * difficulty
     
-    def draw(self, screen, ground_y):
-        if self.rect.y < ground_y:
-            visible_height = min(self.rect.height, ground_y - self.rect.y)
+    def draw(self, screen, ground_y, alpha=1.0, view=None, simplify=None):
+        # simplify: optional sprite -> cheaper sprite to blit in its place (quality governor)
+        y = self.rect.y if alpha >= 1.0 else round(self.prev_y + (self.y - self.prev_y) * alpha)
+        if y <= -self.rect.height:
+            # Still above the screen
+            return None
+        if view:
+            return self.draw_scaled(screen, ground_y, y, view, simplify)
+        if y < ground_y:
+            visible_height = min(self.rect.height, ground_y - y)
             if visible_height > 0:
                 if self.sprites and self.sprites[self.frame]:
                     sprite_surface = self.sprites[self.frame]
+                    if simplify:
+                        sprite_surface = simplify(sprite_surface)
                     visible_rect = pygame.Rect(0, 0, self.rect.width, visible_height)
-                    cropped_sprite = sprite_surface.subsurface(visible_rect)
-                    screen.blit(cropped_sprite, (self.rect.x, self.rect.y))
+                    return screen.blit(sprite_surface, (self.rect.x, y), visible_rect)
                 else:
-                    visible_rect = pygame.Rect(self.rect.x, self.rect.y, self.rect.width, visible_height)
-                    pygame.draw.rect(screen, RED, visible_rect)
+                    visible_rect = pygame.Rect(self.rect.x, y, self.rect.width, visible_height)
+                    return pygame.draw.rect(screen, RED, visible_rect)
+        return None
+    
+    def draw_scaled(self, screen, ground_y, y, view, simplify=None):
+        rect = view.rect((self.rect.x, y, self.rect.width, self.rect.height))
+        visible_height = min(rect.height, view.point(0, ground_y)[1] - rect.y)
+        if visible_height <= 0:
+            return None
+        if self.sprites and self.sprites[self.frame]:
+            sprite = view.sprite(self.sprites[self.frame])
+            if simplify:
+                sprite = simplify(sprite)
+            return screen.blit(sprite, rect, (0, 0, rect.width, visible_height))
+        return pygame.draw.rect(screen, RED, (rect.x, rect.y, rect.width, visible_height))
 
 class EnemyManager:
-    def __init__(self):
+    def __init__(self, rng=random):
         self.enemies = []
+        self.rng = rng
+        self.grid = SpatialGrid()
+        # Enemy type -> collision mask per sprite frame
+        self.masks = {}
     
-    def create_enemies(self, difficulty, selected_enemies, enemy_sprites):
+    def create_enemies(self, difficulty, selected_enemies, enemy_sprites, num_enemies=None):
         self.enemies = []
-        num_enemies = difficulty * 2
+        self.grid.clear()
+        if num_enemies is None:
+            num_enemies = difficulty * 2
         
         for _ in range(num_enemies):
-            enemy_type = random.choice(selected_enemies)
+            enemy_type = self.rng.choice(selected_enemies)
             enemy = Enemy(
-                random.randint(0, WIDTH - PLAYER_SIZE),
-                random.randint(-800, -50),
+                self.rng.randint(0, WIDTH - PLAYER_SIZE),
+                self.rng.randint(-800, -50),
                 enemy_type,
-                enemy_sprites[enemy_type],
-                difficulty
+                enemy_sprites.get(enemy_type),
+                difficulty,
+                self.rng
             )
             self.enemies.append(enemy)
+            self.grid.insert(enemy)
     
-    def update_enemies(self, difficulty):
+    def update_enemies(self, difficulty, dt=TICK_DT):
         score_gained = 0
         
         for enemy in self.enemies:
-            enemy.update()
+            enemy.update(dt)
             
             if enemy.is_off_screen():
                 enemy.reset_position()
                 score_gained += 1
                 enemy.increase_speed(difficulty)
+            
+            self.grid.update(enemy)
         
         return score_gained
     
+    def query(self, rects):
+        # Enemies overlapping any of the given rects (several players, a dash-swept rect, ...)
+        return self.grid.query_many(rects)
+    
+    def first_hit(self, player):
+        # The grid's rect overlaps are the early-out; only those get the pixel test
+        masks = self.masks
+        for enemy in self.grid.query(player.rect):
+            if pixel_hit(player, masks.get(enemy.type), enemy.frame, enemy.rect.x, enemy.rect.y):
+                return enemy
+        return None
+    
     def check_collisions(self, player):
-        for enemy in self.enemies:
-            if player.rect.colliderect(enemy.rect):
-                enemy.reset_position()
-                return True
+        enemy = self.first_hit(player)
+        if enemy:
+            enemy.reset_position()
+            self.grid.update(enemy)
+            return True
         return False
     
-    def draw_all(self, screen, ground_y):
+    def draw_all(self, screen, ground_y, alpha=1.0, view=None, simplify=None):
+        drawn = []
         for enemy in self.enemies:
-            enemy.draw(screen, ground_y)
+            rect = enemy.draw(screen, ground_y, alpha, view, simplify)
+            if rect:
+                drawn.append(rect)
+        return drawn
     
     def set_all_speed_modifier(self, modifier):
         for enemy in self.enemies:
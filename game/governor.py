@@ -0,0 +1,123 @@
+import pygame
+from .config import *
+
+# Adaptive quality: Game hands the governor how long each playing frame took to produce
+# (everything but the pacing wait). Every QUALITY_WINDOW frames the p90 is compared with the
+# frame time of QUALITY_TARGET_FPS, and the level moves one step at most:
+#   1  fewer effects: particle draws capped at QUALITY_PARTICLE_BUDGET
+#   2  HUD rebuilt at most every QUALITY_HUD_FRAMES frames (score and timers lag a little)
+#   3  enemies drawn from RLE colour-keyed copies of their sprites instead of per-pixel alpha
+#   4  no new particles; the ones already out fade away
+# Only drawing is degraded: enemy animation frames pick the collision masks, so they stay
+# simulation state and replays and network peers never see the level.
+#
+# A restore that has to be undone within one window doubles how many calm windows the next
+# restore waits for, so a load sitting right at the edge doesn't flip levels every window.
+
+EFFECTS_REDUCED, HUD_THROTTLED, FLAT_SPRITES, EFFECTS_OFF = range(1, len(QUALITY_LEVELS))
+
+def flatten(surface):
+    # Per-pixel alpha -> opaque pixels plus an RLE colour key: a hard-edged copy that blits
+    # several times faster
+    flat = pygame.Surface(surface.get_size()).convert()
+    key = (255, 0, 255)
+    flat.fill(key)
+    alpha = surface.copy()
+    # Half-transparent edge pixels either become solid or vanish
+    pixels = pygame.surfarray.pixels_alpha(alpha)
+    pixels[pixels < 128] = 0
+    pixels[pixels >= 128] = 255
+    del pixels
+    flat.blit(alpha, (0, 0))
+    flat.set_colorkey(key, pygame.RLEACCEL)
+    return flat
+
+class QualityGovernor:
+    def __init__(self, target_fps=QUALITY_TARGET_FPS, window=QUALITY_WINDOW, enabled=True):
+        self.budget = 1.0 / target_fps
+        self.window = window
+        self.enabled = enabled
+        self.level = 0
+        self.samples = []
+        self.frames = 0
+        self.frames_at = [0] * len(QUALITY_LEVELS)
+        self.changes = 0
+
+        self.calm = 0
+        self.restore_wait = 1
+        self.restored = False
+        # Source sprite -> flattened copy
+        self.flat_sprites = {}
+
+    @property
+    def label(self):
+        return QUALITY_LEVELS[self.level]
+
+    def frame(self, work):
+        # Returns True when this frame's sample changed the level
+        self.frames += 1
+        self.frames_at[self.level] += 1
+        if not self.enabled:
+            return False
+        self.samples.append(work)
+        if len(self.samples) < self.window:
+            return False
+
+        ordered = sorted(self.samples)
+        load = ordered[len(ordered) * 9 // 10]
+        self.samples.clear()
+        restored, self.restored = self.restored, False
+
+        if load > self.budget * QUALITY_DEGRADE:
+            self.calm = 0
+            if restored:
+                self.restore_wait = min(QUALITY_MAX_RESTORE_WAIT, self.restore_wait * 2)
+            if self.level < len(QUALITY_LEVELS) - 1:
+                return self.change(self.level + 1, load)
+            return False
+
+        if restored:
+            # The restored level held for a whole window
+            self.restore_wait = max(1, self.restore_wait // 2)
+        if load >= self.budget * QUALITY_RESTORE:
+            self.calm = 0
+            return False
+        self.calm += 1
+        if self.level > 0 and self.calm >= self.restore_wait:
+            self.calm = 0
+            self.restored = True
+            return self.change(self.level - 1, load)
+        return False
+
+    def change(self, level, load):
+        self.level = level
+        self.changes += 1
+        print(f"Chất lượng: mức {level} ({self.label}), p90 {load * 1000:.1f} ms / {self.budget * 1000:.1f} ms")
+        return True
+
+    def particle_budget(self):
+        return PARTICLE_DRAW_BUDGET if self.level < EFFECTS_REDUCED else QUALITY_PARTICLE_BUDGET
+
+    def emit_effects(self):
+        return self.level < EFFECTS_OFF
+
+    def hud_label(self):
+        # Shown in the HUD only while degraded
+        return self.label if self.level else None
+
+    def hud_due(self):
+        return self.level < HUD_THROTTLED or self.frames % QUALITY_HUD_FRAMES == 0
+
+    def sprite_filter(self):
+        return self.flat if self.level >= FLAT_SPRITES else None
+
+    def flat(self, surface):
+        flat = self.flat_sprites.get(surface)
+        if flat is None:
+            flat = self.flat_sprites[surface] = flatten(surface)
+        return flat
+
+    def report(self):
+        total = max(1, sum(self.frames_at))
+        shares = ", ".join(f"{level} {frames / total:.0%}" for level, frames in enumerate(self.frames_at) if frames)
+        return f"Chất lượng: {self.changes} lần đổi mức, khung hình theo mức: {shares}"
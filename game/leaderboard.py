@@ -0,0 +1,155 @@
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from .config import *
+
+# Finished runs go into SQLite (WAL mode) through a background writer thread that batches
+# inserts into one transaction; the game thread only puts records on a queue. The top
+# scores per (difficulty, mode) are kept in memory, loaded once at startup, so the game
+# over screen never waits on the disk.
+
+COLUMNS = ("timestamp", "player_type", "difficulty", "endless", "seed", "score", "duration",
+           "damage_taken", "abilities_used", "wave")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    player_type TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    endless INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    damage_taken INTEGER NOT NULL,
+    abilities_used INTEGER NOT NULL,
+    wave INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_mode_score ON runs (difficulty, endless, score DESC);
+"""
+
+INSERT = f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps commits durable against crashes with NORMAL; FULL would fsync every batch
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def run_record(sim):
+    return {
+        "timestamp": time.time(),
+        "player_type": sim.player_type,
+        "difficulty": sim.difficulty,
+        "endless": int(sim.endless),
+        "seed": sim.seed,
+        "score": sim.score,
+        "duration": round(sim.time, 3),
+        "damage_taken": INITIAL_HP - sim.player.hp,
+        "abilities_used": sim.abilities_used,
+        "wave": sim.wave,
+    }
+
+class Leaderboard:
+    def __init__(self, path=LEADERBOARD_PATH, top_n=LEADERBOARD_TOP_N):
+        self.path = path
+        self.top_n = top_n
+        self.top = {}
+        self.queue = queue.Queue()
+        self.written = 0
+        self.load_top()
+        self.writer = threading.Thread(target=self.write_loop, name="leaderboard-writer", daemon=True)
+        self.writer.start()
+
+    def load_top(self):
+        connection = connect(self.path)
+        try:
+            rows = connection.execute(f"""
+                SELECT {', '.join(COLUMNS)} FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY difficulty, endless ORDER BY score DESC, id) AS rank
+                    FROM runs
+                ) WHERE rank <= ? ORDER BY score DESC, id
+            """, (self.top_n,)).fetchall()
+        finally:
+            connection.close()
+        for row in rows:
+            entries = self.top.setdefault((row[2], row[3]), [])
+            entries.append(dict(zip(COLUMNS, row)))
+
+    def record(self, sim):
+        # Queues the run for writing and returns it with its rank in its mode (None if unranked)
+        entry = run_record(sim)
+        self.queue.put(entry)
+        entries = self.top.setdefault((entry["difficulty"], entry["endless"]), [])
+        # Ties keep the earlier run ahead, matching the ORDER BY used when loading
+        rank = next((i for i, other in enumerate(entries) if entry["score"] > other["score"]), len(entries))
+        entries.insert(rank, entry)
+        del entries[self.top_n:]
+        entry["rank"] = rank + 1 if rank < self.top_n else None
+        return entry
+
+    def top_scores(self, difficulty, endless):
+        return self.top.get((difficulty, int(endless)), [])
+
+    def write_loop(self):
+        connection = connect(self.path)
+        try:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                # Runs that finish close together (or a queued shutdown) go in one transaction
+                deadline = time.monotonic() + LEADERBOARD_BATCH_SECONDS
+                while True:
+                    try:
+                        batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    running = False
+                    batch = [entry for entry in batch if entry is not None]
+                if batch:
+                    with connection:
+                        connection.executemany(INSERT, [tuple(entry[column] for column in COLUMNS)
+                                                        for entry in batch])
+                    self.written += len(batch)
+        finally:
+            connection.close()
+
+    def close(self, timeout=5.0):
+        self.queue.put(None)
+        self.writer.join(timeout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the local leaderboard and run statistics")
+    parser.add_argument("--db", default=LEADERBOARD_PATH)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Chưa có dữ liệu: {args.db}")
+        return 1
+    connection = connect(args.db)
+    print("Điểm cao nhất:")
+    for rank, (score, player_type, difficulty, endless, duration) in enumerate(connection.execute(
+            "SELECT score, player_type, difficulty, endless, duration FROM runs ORDER BY score DESC, id LIMIT ?",
+            (args.top,)), 1):
+        mode = "vô tận" if endless else f"cấp {difficulty}"
+        print(f"  {rank:2d}. {score:6d} điểm  {player_type:5s} {mode:8s} {duration:7.1f}s")
+
+    print("Thống kê theo nhân vật:")
+    for player_type, runs, avg_score, avg_duration, damage, abilities in connection.execute(
+            "SELECT player_type, COUNT(*), AVG(score), AVG(duration), AVG(damage_taken), AVG(abilities_used) "
+            "FROM runs GROUP BY player_type ORDER BY player_type"):
+        print(f"  {player_type:5s} {runs:5d} ván, điểm TB {avg_score:7.1f}, thời gian TB {avg_duration:6.1f}s, "
+              f"mất máu TB {damage:.2f}, chiêu TB {abilities:.1f}")
+    connection.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import sys
+from .config import *
+from .policies import POLICIES, make_policy
+from .server import GameServer
+from .client import NetSession, connect
+
+# Runs a server and bot clients in one process over real localhost sockets, with optional
+# added latency, and prints what the protocol cost: bandwidth, snapshot sizes, round trips
+# and how often client prediction had to be corrected.
+
+async def drive(session, policy):
+    # A headless client: steps its session at the server's tick rate until the match ends
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    while not session.game_over:
+        session.step(None, *policy(session))
+        next_tick += session.dt
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+async def run_loopback(server, sessions, policies, latency):
+    port = await server.start("127.0.0.1", 0)
+    connections = [asyncio.create_task(connect(session, "127.0.0.1", port, latency)) for session in sessions]
+    await asyncio.gather(server.run(), *(drive(session, policy) for session, policy in zip(sessions, policies)))
+    await asyncio.gather(*connections)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a networked match between bots over localhost")
+    parser.add_argument("--clients", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added one-way delay per message")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--enemies", type=int, default=None, help="fixed enemy count (NumPy enemy store)")
+    parser.add_argument("--endless", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--snapshot-every", type=int, default=NET_SNAPSHOT_EVERY, help="ticks between snapshots")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.clients, args.difficulty, ENEMY_TYPES, args.seed, args.enemies, args.endless,
+                        snapshot_every=args.snapshot_every, max_seconds=args.seconds)
+    sessions = [NetSession(PLAYER_TYPES[i % len(PLAYER_TYPES)]) for i in range(args.clients)]
+    policies = [make_policy(args.policy, args.seed + i) for i in range(args.clients)]
+    asyncio.run(run_loopback(server, sessions, policies, args.latency_ms / 1000))
+
+    print(server.report())
+    for session in sessions:
+        print("  " + session.report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import statistics
+import struct
+import zlib
+from .config import *
+from .enemy_array import ArrayEnemyManager
+from .replay import write_varint, read_varint
+
+# Wire protocol shared by game/server.py and game/client.py. Every message is a u32 length
+# prefix and a payload whose first byte is the message type. State snapshots are flat lists
+# of ints, sent as zigzag varints of the difference to a snapshot the client has acked
+# (or to zeros for a full snapshot), then zlib'd; most fields barely change between
+# ticks, so deltas are mostly single zero bytes and compress well. Small states where
+# zlib's own overhead would make them bigger go out as plain varints.
+
+MSG_HELLO = 1     # client -> server: player type
+MSG_WELCOME = 2   # server -> client: player id and match settings
+MSG_INPUT = 3     # client -> server: input sequence number, latest snapshot tick received, input bits
+MSG_SNAPSHOT = 4  # server -> client: tick, baseline tick (0 = full), compressed state
+
+FRAME = struct.Struct("<I")
+HELLO = struct.Struct("<BB")
+WELCOME = struct.Struct("<BBHBBBBB")
+INPUT = struct.Struct("<BIIB")
+SNAPSHOT = struct.Struct("<BII")
+
+# Snapshot layout: HEADER_FIELDS, then PLAYER_FIELDS per player, then ENEMY_FIELDS per enemy
+HEADER_FIELDS = 5   # score, game over, wave, player count, enemy count
+PLAYER_FIELDS = 10  # id, type, x, hp, flags, direction, cooldown ms, duration ms, dash modifier, last input seq
+ENEMY_FIELDS = 4    # x, y, type, animation frame
+POSITION_SCALE = 16
+DIRECTIONS = ("idle", "left", "right")
+
+def frame(payload):
+    return FRAME.pack(len(payload)) + payload
+
+async def read_frame(reader):
+    (length,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return await reader.readexactly(length)
+
+def zigzag(value):
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+def unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+def encode_state(values, baseline=None):
+    out = bytearray()
+    if baseline is None:
+        for value in values:
+            write_varint(out, zigzag(value))
+    else:
+        base_count = len(baseline)
+        for i, value in enumerate(values):
+            write_varint(out, zigzag(value - (baseline[i] if i < base_count else 0)))
+    compressed = zlib.compress(bytes(out), NET_COMPRESSION_LEVEL)
+    if len(compressed) < len(out):
+        return b"\x01" + compressed
+    return b"\x00" + bytes(out)
+
+def decode_state(data, baseline=None):
+    data = zlib.decompress(data[1:]) if data[0] else data[1:]
+    values = []
+    pos = 0
+    base_count = len(baseline) if baseline is not None else 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        i = len(values)
+        values.append(unzigzag(value) + (baseline[i] if i < base_count else 0))
+    return values
+
+def enemy_rows(manager):
+    # (x, y, ENEMY_TYPES index, frame) for every enemy, whichever enemy store is in use
+    if isinstance(manager, ArrayEnemyManager):
+        type_ids = [ENEMY_TYPES.index(enemy_type) for enemy_type in manager.types]
+        return zip(manager.x.tolist(), manager.y.tolist(),
+                   [type_ids[i] for i in manager.type_index.tolist()], manager.frame.tolist())
+    return ((enemy.rect.x, enemy.y, ENEMY_TYPES.index(enemy.type), enemy.frame) for enemy in manager.enemies)
+
+def player_fields(player_id, player, last_seq):
+    flags = (1 if player.ability_active else 0) | (2 if player.invulnerable else 0)
+    return [player_id, PLAYER_TYPES.index(player.player_type), round(player.x * POSITION_SCALE), player.hp, flags,
+            DIRECTIONS.index(player.direction), round(player.ability_cooldown * 1000),
+            round(player.ability_duration * 1000), round(player.dash_speed_modifier * POSITION_SCALE), last_seq]
+
+def apply_player_fields(player, fields):
+    _, _, x, hp, flags, direction, cooldown, duration, dash, _ = fields
+    player.x = x / POSITION_SCALE
+    player.rect.x = round(player.x)
+    player.hp = hp
+    player.ability_active = bool(flags & 1)
+    player.invulnerable = bool(flags & 2)
+    player.direction = DIRECTIONS[direction]
+    player.ability_cooldown = cooldown / 1000
+    player.ability_duration = duration / 1000
+    player.dash_speed_modifier = dash / POSITION_SCALE
+
+def capture(match, last_seqs):
+    values = [match.score, int(match.game_over), match.wave or 0, len(match.players), 0]
+    for player_id, player in match.players.items():
+        values.extend(player_fields(player_id, player, last_seqs.get(player_id, 0)))
+    enemies = 0
+    for x, y, type_id, frame in enemy_rows(match.enemy_manager):
+        values.extend((round(x), round(y * POSITION_SCALE), type_id, frame))
+        enemies += 1
+    values[4] = enemies
+    return values
+
+def split_state(values):
+    # -> header, [player field lists], [enemy field lists]
+    players = values[3]
+    start = HEADER_FIELDS
+    player_rows = [values[start + i * PLAYER_FIELDS:start + (i + 1) * PLAYER_FIELDS] for i in range(players)]
+    start += players * PLAYER_FIELDS
+    enemy_rows = [values[start + i * ENEMY_FIELDS:start + (i + 1) * ENEMY_FIELDS] for i in range(values[4])]
+    return values[:HEADER_FIELDS], player_rows, enemy_rows
+
+class NetStats:
+    # Byte and message counters for one end of a connection, plus round-trip and snapshot samples
+    def __init__(self):
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.full_snapshots = 0
+        self.delta_snapshots = 0
+        self.snapshot_bytes = 0
+        # What the same snapshot messages would have cost as full, uncompressed varint lists
+        self.uncompressed_bytes = 0
+        self.rtt = []
+        self.corrections = 0
+        self.correction_px = []
+
+    def sent(self, size):
+        self.bytes_sent += size
+        self.messages_sent += 1
+
+    def received(self, size):
+        self.bytes_received += size
+        self.messages_received += 1
+
+    def summary(self, seconds):
+        result = {
+            "up_bytes_per_s": self.bytes_sent / seconds,
+            "down_bytes_per_s": self.bytes_received / seconds,
+            "messages_sent": self.messages_sent,
+            "messages_received": self.messages_received,
+        }
+        snapshots = self.full_snapshots + self.delta_snapshots
+        if snapshots:
+            result.update({
+                "snapshots": snapshots,
+                "full_snapshots": self.full_snapshots,
+                "avg_snapshot_bytes": self.snapshot_bytes / snapshots,
+                "compression_ratio": self.uncompressed_bytes / max(1, self.snapshot_bytes),
+            })
+        if self.rtt:
+            ordered = sorted(self.rtt)
+            result.update({
+                "rtt_mean_ms": statistics.fmean(ordered) * 1000,
+                "rtt_p50_ms": ordered[len(ordered) // 2] * 1000,
+                "rtt_p99_ms": ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)] * 1000,
+            })
+        if self.correction_px:
+            result.update({
+                "corrections": self.corrections,
+                "max_correction_px": max(self.correction_px),
+            })
+        return result
+
+def uncompressed_size(values):
+    out = bytearray()
+    for value in values:
+        write_varint(out, zigzag(value))
+    return len(out)
@@ -0,0 +1,113 @@
+import statistics
+import time
+from array import array
+from .config import *
+
+# sleep:    pygame.time.Clock.tick, sleeps with the OS timer's granularity (the old behaviour)
+# busy:     Clock.tick_busy_loop, spins on the CPU for exact frame boundaries
+# hybrid:   sleeps until PACING_SPIN_MARGIN before the deadline, then spins the rest
+# vsync:    presenting blocks on the display's refresh; no extra waiting
+# uncapped: no waiting at all
+PACING_MODES = ("sleep", "busy", "hybrid", "vsync", "uncapped")
+
+class FramePacer:
+    def __init__(self, clock, mode="sleep", fps=RENDER_FPS):
+        self.clock = clock
+        self.mode = mode
+        self.fps = fps
+        self.period = 1.0 / fps if fps else 0.0
+        self.deadline = None
+
+    def wait(self):
+        if self.mode == "sleep":
+            self.clock.tick(self.fps)
+        elif self.mode == "busy":
+            self.clock.tick_busy_loop(self.fps)
+        elif self.mode == "hybrid" and self.period:
+            self.wait_hybrid()
+            self.clock.tick()
+        else:
+            self.clock.tick()
+
+    def wait_hybrid(self):
+        now = time.perf_counter()
+        if self.deadline is None or now - self.deadline > self.period:
+            # First frame, or fell more than a frame behind: restart the schedule from now
+            # instead of rushing frames out to catch up
+            self.deadline = now + self.period
+            return
+        remaining = self.deadline - now - PACING_SPIN_MARGIN
+        if remaining > 0:
+            time.sleep(remaining)
+        while time.perf_counter() < self.deadline:
+            pass
+        self.deadline += self.period
+
+class LatencyMonitor:
+    # Present-to-present frame intervals and input-to-present latency in ring buffers.
+    # Latency runs from the moment the game loop sees the key event (the sample time when no
+    # event was seen) to the end of the present that first shows the simulation stepped with it.
+    def __init__(self, capacity=PROFILER_CAPACITY):
+        self.capacity = capacity
+        self.intervals = array('d', bytes(8 * capacity))
+        self.latencies = array('d', bytes(8 * capacity))
+        self.frames = 0
+        self.inputs = 0
+        self.last_present = None
+        self.input_time = None
+
+    def input_changed(self, now):
+        # Keep the earliest unshown change; a second one before the next present is the same frame
+        if self.input_time is None:
+            self.input_time = now
+
+    def presented(self, now):
+        if self.last_present is not None:
+            self.intervals[self.frames % self.capacity] = now - self.last_present
+            self.frames += 1
+        self.last_present = now
+        if self.input_time is not None:
+            self.latencies[self.inputs % self.capacity] = now - self.input_time
+            self.inputs += 1
+            self.input_time = None
+
+    def recent(self, values, count):
+        return sorted(values[:min(count, self.capacity)])
+
+    def summary(self):
+        intervals = self.recent(self.intervals, self.frames)
+        latencies = self.recent(self.latencies, self.inputs)
+        result = {"frames": len(intervals), "inputs": len(latencies)}
+        if len(intervals) > 1:
+            p50 = quantile_ms(intervals, 0.50)
+            p99 = quantile_ms(intervals, 0.99)
+            result.update({
+                "fps": len(intervals) / sum(intervals),
+                "frame_p50_ms": p50,
+                "frame_p99_ms": p99,
+                "jitter_stdev_ms": statistics.stdev(intervals) * 1000.0,
+                "jitter_p99_p50_ms": p99 - p50,
+            })
+        if latencies:
+            result.update({
+                "latency_mean_ms": statistics.fmean(latencies) * 1000.0,
+                "latency_p50_ms": quantile_ms(latencies, 0.50),
+                "latency_p99_ms": quantile_ms(latencies, 0.99),
+                "latency_max_ms": latencies[-1] * 1000.0,
+            })
+        return result
+
+    def report(self):
+        s = self.summary()
+        lines = [f"Khung hình: {s['frames']}"]
+        if "fps" in s:
+            lines.append(f"  {s['fps']:.1f} FPS, p50 {s['frame_p50_ms']:.2f} ms, p99 {s['frame_p99_ms']:.2f} ms, "
+                         f"jitter {s['jitter_stdev_ms']:.2f} ms (độ lệch chuẩn), {s['jitter_p99_p50_ms']:.2f} ms (p99-p50)")
+        if "latency_mean_ms" in s:
+            lines.append(f"Độ trễ phím -> màn hình ({s['inputs']} lần): trung bình {s['latency_mean_ms']:.2f} ms, "
+                         f"p50 {s['latency_p50_ms']:.2f} ms, p99 {s['latency_p99_ms']:.2f} ms, "
+                         f"tối đa {s['latency_max_ms']:.2f} ms")
+        return "\n".join(lines)
+
+def quantile_ms(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000.0
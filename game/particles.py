@@ -0,0 +1,135 @@
+import math
+import numpy as np
+import pygame
+from .config import *
+
+KIND_NAMES = tuple(PARTICLE_KINDS)
+KIND_INDEX = {name: index for index, name in enumerate(KIND_NAMES)}
+
+class ParticleSystem:
+    # Live particles are packed at the front of preallocated arrays and updated as whole
+    # arrays; expired ones are compacted out with one mask per update. Drawing is a single
+    # screen.blits() over pre-faded sprites, capped at draw_budget particles per frame.
+    def __init__(self, capacity=PARTICLE_CAPACITY, draw_budget=PARTICLE_DRAW_BUDGET, view=None, seed=None):
+        self.capacity = capacity
+        self.draw_budget = draw_budget
+        self.view = view
+        # Effects are cosmetic, so they get their own generator and never touch the simulation's
+        self.rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.life = np.ones(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int32)
+        self.arrays = (self.x, self.y, self.vx, self.vy, self.age, self.life, self.kind)
+        self.count = 0
+
+        self.gravity = np.array([PARTICLE_KINDS[name]["gravity"] for name in KIND_NAMES], dtype=np.float64)
+        # One sprite per (kind, fade level), flattened so a particle's sprite is kind * steps + level
+        self.sprite_table = []
+        offsets = []
+        for name in KIND_NAMES:
+            sprites = self.build_sprites(PARTICLE_KINDS[name])
+            self.sprite_table.extend(sprites)
+            offsets.append(sprites[0].get_width() / 2)
+        self.offsets = np.array(offsets)
+
+        self.emit_carry = {}
+        self.dropped = 0
+        self.culled = 0
+
+    def build_sprites(self, params):
+        size = self.view.length(params["size"]) if self.view else params["size"]
+        sprites = []
+        for level in range(PARTICLE_FADE_STEPS):
+            alpha = round(255 * (level + 1) / PARTICLE_FADE_STEPS)
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, params["color"] + (alpha,), (size / 2, size / 2), size / 2)
+            sprites.append(sprite)
+        return sprites
+
+    def clear(self):
+        self.count = 0
+        self.emit_carry.clear()
+
+    def emit(self, name, x, y, count, radius=0.0, ring=False):
+        # Spawns `count` particles spread over a circle of `radius` around (x, y), moving
+        # outwards; ring=True spaces them evenly instead of at random angles
+        room = self.capacity - self.count
+        if count > room:
+            self.dropped += count - room
+            count = room
+        if count <= 0:
+            return
+
+        params = PARTICLE_KINDS[name]
+        rng = self.rng
+        if ring:
+            angle = np.linspace(0.0, 2 * math.pi, count, endpoint=False) + rng.uniform(0.0, 2 * math.pi)
+        else:
+            angle = rng.uniform(0.0, 2 * math.pi, count)
+        speed = rng.uniform(*params["speed"], count)
+        cos = np.cos(angle)
+        sin = np.sin(angle)
+
+        s = slice(self.count, self.count + count)
+        self.x[s] = x + cos * radius
+        self.y[s] = y + sin * radius
+        self.vx[s] = cos * speed
+        self.vy[s] = sin * speed - params["lift"]
+        self.age[s] = 0.0
+        self.life[s] = params["life"] * rng.uniform(0.7, 1.0, count)
+        self.kind[s] = KIND_INDEX[name]
+        self.count += count
+
+    def emit_rate(self, name, x, y, rate, dt, radius=0.0):
+        # Continuous emitter: `rate` particles per second, carrying fractions between calls
+        budget = self.emit_carry.get(name, 0.0) + rate * dt
+        count = int(budget)
+        self.emit_carry[name] = budget - count
+        if count:
+            self.emit(name, x, y, count, radius)
+
+    def update(self, dt):
+        n = self.count
+        if not n:
+            return
+        kind = self.kind[:n]
+        vy = self.vy[:n]
+        vy += self.gravity[kind] * dt
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += vy * dt
+        age = self.age[:n]
+        age += dt
+
+        alive = age < self.life[:n]
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            for array in self.arrays:
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
+
+    def draw(self, screen):
+        n = self.count
+        if not n:
+            return []
+        # Over budget, the newest particles are the ones drawn
+        start = max(0, n - self.draw_budget)
+        self.culled += start
+        s = slice(start, n)
+
+        kind = self.kind[s]
+        level = ((1.0 - self.age[s] / self.life[s]) * PARTICLE_FADE_STEPS).astype(np.int32)
+        np.clip(level, 0, PARTICLE_FADE_STEPS - 1, out=level)
+        sprite_index = (kind * PARTICLE_FADE_STEPS + level).tolist()
+
+        scale = self.view.scale if self.view else 1.0
+        offset = self.offsets[kind]
+        xs = np.rint(self.x[s] * scale - offset).astype(np.int32).tolist()
+        ys = np.rint(self.y[s] * scale - offset).astype(np.int32).tolist()
+
+        table = self.sprite_table
+        return screen.blits([(table[i], (x, y)) for i, x, y in zip(sprite_index, xs, ys)])
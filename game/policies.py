@@ -0,0 +1,53 @@
+import random
+import pygame
+from .config import *
+from .autopilot import Autopilot
+
+# Headless input policies: each is a callable taking a Simulation and returning the
+# (left, right, ability) input for the next tick.
+
+def idle_policy(sim):
+    return False, False, False
+
+def make_random_policy(seed):
+    rng = random.Random(seed)
+    state = {"input": (False, False, False), "hold": 0}
+
+    def policy(sim):
+        if state["hold"] <= 0:
+            direction = rng.choice(("left", "right", "idle"))
+            state["input"] = (direction == "left", direction == "right", rng.random() < 0.1)
+            state["hold"] = rng.randint(5, 40)
+        state["hold"] -= 1
+        return state["input"]
+    return policy
+
+def dodge_policy(sim):
+    # Moves towards whichever side has fewer enemies falling onto it; uses the ability when
+    # something is about to land on the player
+    manager = sim.enemy_manager
+    rect = sim.player.rect
+    threat = pygame.Rect(rect.x - 10, rect.y - DODGE_LOOKAHEAD, rect.w + 20, DODGE_LOOKAHEAD + rect.h)
+    if not len(manager.query([threat])):
+        return False, False, False
+
+    side_width = rect.w * 3
+    left_zone = pygame.Rect(rect.x - side_width, threat.y, side_width, threat.h)
+    right_zone = pygame.Rect(rect.right, threat.y, side_width, threat.h)
+    left_threat = len(manager.query([left_zone])) if rect.left > side_width else float("inf")
+    right_threat = len(manager.query([right_zone])) if rect.right < WIDTH - side_width else float("inf")
+
+    imminent = pygame.Rect(rect.x, rect.y - rect.h, rect.w, rect.h * 2)
+    ability = bool(len(manager.query([imminent])))
+    go_left = left_threat < right_threat or (left_threat == right_threat and rect.centerx > WIDTH // 2)
+    return go_left, not go_left, ability
+
+POLICIES = {
+    "idle": lambda seed: idle_policy,
+    "random": make_random_policy,
+    "dodge": lambda seed: dodge_policy,
+    "autopilot": lambda seed: Autopilot(adaptive=False),
+}
+
+def make_policy(name, seed=0):
+    return POLICIES[name](seed)
@@ -0,0 +1,144 @@
+import csv
+import json
+import time
+from array import array
+from contextlib import nullcontext
+import pygame
+from .config import *
+
+# draw_all, draw_hud and present run inside render; trace viewers nest them by time
+PHASES = ("frame", "events", "input", "update", "render", "draw_all", "draw_hud", "present")
+
+NULL_SECTION = nullcontext()
+
+class Section:
+    __slots__ = ("profiler", "slot", "start")
+
+    def __init__(self, profiler, slot):
+        self.profiler = profiler
+        self.slot = slot
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.slot, self.start, time.perf_counter_ns() - self.start)
+
+class FrameProfiler:
+    # Per-phase timings for the last `capacity` frames in flat ring buffers (one row of
+    # len(PHASES) slots per frame). While disabled, section() hands back a shared no-op
+    # context manager, so instrumented code costs one method call per phase.
+    def __init__(self, capacity=PROFILER_CAPACITY, render_fps=RENDER_FPS):
+        self.capacity = capacity
+        # Frame budget for the overlay's target line; an uncapped game (0) is held to RENDER_FPS
+        self.budget_ms = 1000.0 / (render_fps or RENDER_FPS)
+        self.enabled = False
+        self.recording = False
+        self.overlay_visible = False
+        self.starts = array('q', bytes(8 * capacity * len(PHASES)))
+        self.durations = array('q', bytes(8 * capacity * len(PHASES)))
+        self.sections = {phase: Section(self, slot) for slot, phase in enumerate(PHASES)}
+        self.frames = 0
+        self.row = 0
+        self.frame_start = 0
+        self.readout = None
+
+    def start_recording(self):
+        self.recording = self.enabled = True
+
+    def toggle(self):
+        self.overlay_visible = not self.overlay_visible
+        self.enabled = self.overlay_visible or self.recording
+
+    def section(self, phase):
+        if not self.enabled:
+            return NULL_SECTION
+        return self.sections[phase]
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.row = (self.frames % self.capacity) * len(PHASES)
+        for slot in range(len(PHASES)):
+            self.durations[self.row + slot] = 0
+        self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        # frame_start is 0 when profiling was switched on in the middle of this frame
+        if not self.enabled or not self.frame_start:
+            return
+        self.record(0, self.frame_start, time.perf_counter_ns() - self.frame_start)
+        self.frame_start = 0
+        self.frames += 1
+
+    def record(self, slot, start, duration):
+        self.starts[self.row + slot] = start
+        self.durations[self.row + slot] = duration
+
+    def recorded_rows(self):
+        count = min(self.frames, self.capacity)
+        first = self.frames - count
+        return [(frame, (frame % self.capacity) * len(PHASES)) for frame in range(first, self.frames)]
+
+    def frame_times_ms(self, count=None):
+        rows = self.recorded_rows()
+        if count:
+            rows = rows[-count:]
+        return [self.durations[row] / 1e6 for _, row in rows]
+
+    def percentiles(self, values, points=(50, 95, 99)):
+        ordered = sorted(values)
+        if not ordered:
+            return {point: 0.0 for point in points}
+        return {point: ordered[min(len(ordered) - 1, len(ordered) * point // 100)] for point in points}
+
+    def draw_overlay(self, screen, font):
+        if not self.overlay_visible:
+            return
+        times = self.frame_times_ms(PROFILER_GRAPH_FRAMES)
+        x, y = PROFILER_OVERLAY_POS
+        width, height = PROFILER_GRAPH_FRAMES, PROFILER_GRAPH_HEIGHT
+        scale = height / (2 * self.budget_ms)
+
+        # Re-rendering the readout every frame would show up in the very numbers it prints
+        if self.frames % 30 == 0 or not self.readout:
+            p = self.percentiles(times)
+            self.readout = font.render(f"p50 {p[50]:.1f}  p95 {p[95]:.1f}  p99 {p[99]:.1f} ms", True, WHITE)
+
+        panel = pygame.Rect(x, y, max(width, self.readout.get_width() + 8), height + 24)
+        pygame.draw.rect(screen, (30, 30, 30), panel)
+        target_y = y + height - round(self.budget_ms * scale)
+        pygame.draw.line(screen, GREEN, (x, target_y), (panel.right - 1, target_y))
+        for i, frame_ms in enumerate(times):
+            bar = min(height, round(frame_ms * scale))
+            color = YELLOW if frame_ms <= self.budget_ms else RED
+            pygame.draw.line(screen, color, (x + i, y + height), (x + i, y + height - bar))
+        screen.blit(self.readout, (x + 4, y + height + 2))
+
+    def export_chrome_trace(self, path):
+        events = []
+        for frame, row in self.recorded_rows():
+            for slot, phase in enumerate(PHASES):
+                duration = self.durations[row + slot]
+                if duration:
+                    events.append({
+                        "name": phase, "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                        "ts": self.starts[row + slot] / 1000.0, "dur": duration / 1000.0,
+                        "args": {"frame": frame}
+                    })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{phase}_ms" for phase in PHASES])
+            for frame, row in self.recorded_rows():
+                writer.writerow([frame] + [f"{self.durations[row + slot] / 1e6:.4f}" for slot in range(len(PHASES))])
+
+    def export(self, path):
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_chrome_trace(path)
@@ -0,0 +1,198 @@
+import argparse
+import glob
+import os
+import struct
+import sys
+import time
+from .config import *
+from .simulation import Simulation
+
+# Header, then the per-tick input as run-length encoded (input bits, LEB128 run length)
+# pairs. Inputs only change a few times a second, so a minute of play is a few hundred bytes.
+# The enemy byte holds the selected ENEMY_TYPES as a bit mask, with mode flags in its top bits.
+MAGIC = b"PDRP"
+# 2: pixel-accurate collisions; runs recorded with rect collisions no longer replay the same
+VERSION = 2
+HEADER = struct.Struct("<4sBIHBBBIIIb")
+
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_ABILITY = 4
+
+FLAG_ENDLESS = 0x80
+
+def encode_input(left, right, ability):
+    return (INPUT_LEFT if left else 0) | (INPUT_RIGHT if right else 0) | (INPUT_ABILITY if ability else 0)
+
+def decode_input(bits):
+    return bool(bits & INPUT_LEFT), bool(bits & INPUT_RIGHT), bool(bits & INPUT_ABILITY)
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class Replay:
+    def __init__(self, seed, sim_hz, player_type, difficulty, selected_enemies, enemy_count=None,
+                 runs=None, ticks=0, score=0, hp=INITIAL_HP, endless=False):
+        self.seed = seed
+        self.sim_hz = sim_hz
+        self.player_type = player_type
+        self.difficulty = difficulty
+        self.selected_enemies = list(selected_enemies)
+        self.enemy_count = enemy_count
+        self.endless = endless
+        self.runs = runs if runs is not None else []
+        self.ticks = ticks
+        self.score = score
+        self.hp = hp
+
+    def to_bytes(self):
+        enemy_mask = sum(1 << ENEMY_TYPES.index(enemy_type) for enemy_type in self.selected_enemies)
+        if self.endless:
+            enemy_mask |= FLAG_ENDLESS
+        out = bytearray(HEADER.pack(
+            MAGIC, VERSION, self.seed, self.sim_hz, PLAYER_TYPES.index(self.player_type),
+            self.difficulty, enemy_mask, self.enemy_count or 0, self.ticks, self.score, self.hp
+        ))
+        for bits, count in self.runs:
+            out.append(bits)
+            write_varint(out, count)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, version, seed, sim_hz, player_index, difficulty, enemy_mask, enemy_count,
+         ticks, score, hp) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if version != VERSION:
+            raise ValueError(f"replay version {version}, expected {VERSION}")
+
+        runs = []
+        pos = HEADER.size
+        while pos < len(data):
+            bits = data[pos]
+            count, pos = read_varint(data, pos + 1)
+            runs.append((bits, count))
+
+        selected_enemies = [enemy_type for i, enemy_type in enumerate(ENEMY_TYPES) if enemy_mask & (1 << i)]
+        return cls(seed, sim_hz, PLAYER_TYPES[player_index], difficulty, selected_enemies,
+                   enemy_count or None, runs, ticks, score, hp, bool(enemy_mask & FLAG_ENDLESS))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def inputs(self):
+        for bits, count in self.runs:
+            decoded = decode_input(bits)
+            for _ in range(count):
+                yield decoded
+
+class InputRecorder:
+    def __init__(self, simulation, sim_hz):
+        self.simulation = simulation
+        self.replay = Replay(simulation.seed, sim_hz, simulation.player_type, simulation.difficulty,
+                             simulation.selected_enemies, simulation.enemy_count, endless=simulation.endless)
+        self.bits = None
+        self.count = 0
+
+    def record(self, left, right, ability):
+        bits = encode_input(left, right, ability)
+        if bits == self.bits:
+            self.count += 1
+        else:
+            self.flush()
+            self.bits = bits
+            self.count = 1
+
+    def flush(self):
+        if self.count:
+            self.replay.runs.append((self.bits, self.count))
+            self.count = 0
+
+    def finish(self):
+        self.flush()
+        self.bits = None
+        sim = self.simulation
+        self.replay.ticks = sim.tick
+        self.replay.score = sim.score
+        self.replay.hp = sim.player.hp
+        return self.replay
+
+    def save(self, directory=REPLAY_DIR):
+        os.makedirs(directory, exist_ok=True)
+        replay = self.finish()
+        path = os.path.join(directory, time.strftime(f"%Y%m%d_%H%M%S_{replay.seed:08x}.pdr"))
+        replay.save(path)
+        return path
+
+def simulate(replay):
+    # Re-runs a replay headless, as fast as the simulation can go
+    sim = Simulation(replay.player_type, replay.difficulty, replay.selected_enemies, seed=replay.seed,
+                     enemy_count=replay.enemy_count, array_enemies=replay.enemy_count is not None,
+                     endless=replay.endless)
+    dt = 1.0 / replay.sim_hz
+    for left, right, ability in replay.inputs():
+        sim.step(dt, left, right, ability)
+    return sim
+
+def verify(replay):
+    sim = simulate(replay)
+    return (sim.tick, sim.score, sim.player.hp) == (replay.ticks, replay.score, replay.hp), sim
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate recorded runs and check their results")
+    parser.add_argument("paths", nargs="*", default=[REPLAY_DIR], help="replay files or directories")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.pdr"))))
+        else:
+            files.append(path)
+
+    start = time.perf_counter()
+    failures = 0
+    total_ticks = 0
+    skipped = 0
+    for path in files:
+        try:
+            replay = Replay.load(path)
+        except ValueError as error:
+            skipped += 1
+            print(f"BỎ QUA {path}: {error}")
+            continue
+        ok, sim = verify(replay)
+        total_ticks += sim.tick
+        if not ok:
+            failures += 1
+            print(f"KHÔNG KHỚP {path}: điểm {sim.score}/{replay.score}, HP {sim.player.hp}/{replay.hp}, "
+                  f"tick {sim.tick}/{replay.ticks}")
+    elapsed = time.perf_counter() - start
+
+    checked = len(files) - skipped
+    print(f"{checked - failures}/{checked} replay khớp, {total_ticks} tick trong {elapsed:.2f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,55 @@
 import pygame
 from .config import *
+from .text_cache import TextCache
 
 class ScreenManager:
     def __init__(self, assets):
         self.assets = assets
         self.player_selection_index = 0
         self.difficulty_level = 1
+        self.endless_mode = False
+        
+        self.text_cache = TextCache(TEXT_CACHE_SIZE)
+        self.hud_layer = pygame.Surface((WIDTH, HUD_HEIGHT), pygame.SRCALPHA)
+        self.hud_key = None
+        # Resampled copy of hud_layer for a scaled render target
+        self.hud_scaled = None
+        # Menu screen -> (key, fully drawn surface); redrawn only when its key changes
+        self.menu_cache = {}
     
     def draw_text(self, screen, text, font_size, color, x, y):
         font = self.assets.fonts[font_size]
-        img = font.render(text, True, color)
+        img = self.text_cache.render(font, text, color)
         text_rect = img.get_rect(center=(x, y))
         screen.blit(img, text_rect)
     
+    def menu_key(self, state, args=()):
+        # Everything a menu screen's pixels depend on besides the assets
+        if state == "select_player":
+            return state, self.player_selection_index
+        if state == "select_difficulty":
+            return state, self.difficulty_level, self.endless_mode
+        return state, args
+    
+    def draw_menu(self, screen, state, *args):
+        key = self.menu_key(state, args)
+        cached = self.menu_cache.get(state)
+        if cached is None or cached[0] != key:
+            surface = cached[1] if cached else pygame.Surface((WIDTH, HEIGHT)).convert()
+            surface.fill(WHITE)
+            if state == "start":
+                self.draw_start_screen(surface)
+            elif state == "select_player":
+                self.draw_player_selection(surface)
+            elif state == "select_difficulty":
+                self.draw_difficulty_selection(surface)
+            elif state == "connecting":
+                self.draw_connecting(surface, *args)
+            elif state == "game_over":
+                self.draw_game_over(surface, *args)
+            cached = self.menu_cache[state] = (key, surface)
+        screen.blit(cached[1], (0, 0))
+    
     def draw_start_screen(self, screen):
         if self.assets.images['logo']:
             logo_rect = self.assets.images['logo'].get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))
@@ -79,6 +116,10 @@ class ScreenManager:
         
         self.draw_text(screen, info_text, 'small', BLACK, WIDTH // 2, 250)
         
+        mode_text = "Chế độ vô tận: BẬT" if self.endless_mode else "Chế độ vô tận: TẮT"
+        self.draw_text(screen, f"{mode_text} (nhấn E)", 'small', GREEN if self.endless_mode else GRAY,
+                       WIDTH // 2, HEIGHT // 2 + 80)
+        
         self.draw_difficulty_slider(screen)
     
     def draw_difficulty_slider(self, screen):
@@ -96,39 +137,90 @@ class ScreenManager:
             pygame.draw.circle(screen, level_color, (level_x, slider_y + slider_height // 2), 15)
             self.draw_text(screen, str(i + 1), 'normal', BLACK, level_x, slider_y + slider_height // 2)
     
-    def draw_game_over(self, screen, score):
-        self.draw_text(screen, "GAME OVER", 'title', RED, WIDTH // 2, HEIGHT // 3)
-        self.draw_text(screen, f"Điểm: {score}", 'normal', BLACK, WIDTH // 2, HEIGHT // 2)
-        self.draw_text(screen, "Nhấn ENTER để tiếp tục", 'normal', BLACK, WIDTH // 2, HEIGHT * 2 // 3)
+    def draw_game_over(self, screen, score, run=None, top=None):
+        if not run and not top:
+            self.draw_text(screen, "GAME OVER", 'title', RED, WIDTH // 2, HEIGHT // 3)
+            self.draw_text(screen, f"Điểm: {score}", 'normal', BLACK, WIDTH // 2, HEIGHT // 2)
+            self.draw_text(screen, "Nhấn ENTER để tiếp tục", 'normal', BLACK, WIDTH // 2, HEIGHT * 2 // 3)
+            return
+        
+        self.draw_text(screen, "GAME OVER", 'title', RED, WIDTH // 2, 110)
+        self.draw_text(screen, f"Điểm: {score}", 'normal', BLACK, WIDTH // 2, 190)
+        if run:
+            self.draw_text(screen, f"Thời gian: {run['duration']:.1f}s   Mất máu: {run['damage_taken']}   "
+                                   f"Dùng chiêu: {run['abilities_used']}", 'small', BLUE, WIDTH // 2, 230)
+        
+        if top:
+            mode = "vô tận" if top[0]["endless"] else f"cấp {top[0]['difficulty']}"
+            self.draw_text(screen, f"Bảng xếp hạng ({mode})", 'normal', BLACK, WIDTH // 2, 300)
+            for i, entry in enumerate(top):
+                color = GREEN if entry is run else BLACK
+                self.draw_text(screen, f"{i + 1}. {entry['score']} điểm - {entry['player_type'].capitalize()} - "
+                                       f"{entry['duration']:.0f}s", 'small', color, WIDTH // 2, 340 + i * 32)
+        
+        self.draw_text(screen, "Nhấn ENTER để tiếp tục", 'normal', BLACK, WIDTH // 2, HEIGHT - 80)
+    
+    def draw_connecting(self, screen, address):
+        self.draw_text(screen, "Đang chờ trận đấu...", 'title', BLUE, WIDTH // 2, HEIGHT // 3)
+        self.draw_text(screen, f"Máy chủ: {address}", 'normal', BLACK, WIDTH // 2, HEIGHT // 2)
     
-    def draw_hud(self, screen, score, hp, player=None):
-        self.draw_text(screen, f"Điểm: {score}", 'normal', BLACK, WIDTH // 2, 30)
+    def ability_status(self, player):
+        if player.ability_active:
+            remaining = max(0, player.ability_duration)
+            return f"ĐANG HOẠT ĐỘNG ({remaining:.1f}s)", GREEN
+        elif player.ability_cooldown > 0:
+            return f"Cooldown: {player.ability_cooldown:.1f}s", RED
+        return "Nhấn SPACE để sử dụng", BLUE
+    
+    def draw_hud(self, screen, score, hp, player=None, wave=None, view=None, quality=None, refresh=True):
+        # The HUD is composited into its own layer, re-rendered only when what it shows changes.
+        # Returns the HUD rect when the layer was rebuilt, None when it is unchanged.
+        # quality: label of a degraded quality level to show; refresh=False keeps the layer
+        # already built even if it is out of date.
+        status = self.ability_status(player) if player else None
+        key = (score, hp, player.player_type if player else None, status, wave, quality)
+        changed = key != self.hud_key and (refresh or self.hud_key is None)
+        if changed:
+            self.hud_key = key
+            self.build_hud_layer(score, hp, player, status, wave, quality)
+        if view:
+            if changed or self.hud_scaled is None:
+                self.hud_scaled = view.resample(self.hud_layer)
+            rect = screen.blit(self.hud_scaled, (0, 0))
+        else:
+            rect = screen.blit(self.hud_layer, (0, 0))
+        return rect if changed else None
+    
+    def build_hud_layer(self, score, hp, player, status, wave=None, quality=None):
+        layer = self.hud_layer
+        layer.fill((0, 0, 0, 0))
+        
+        self.draw_text(layer, f"Điểm: {score}", 'normal', BLACK, WIDTH // 2, 30)
+        if wave is not None:
+            self.draw_text(layer, f"Đợt {wave}", 'small', PURPLE, WIDTH // 2, 60)
         
         heart_start_x = 20
         heart_y = 20
         
         for i in range(hp):
             if self.assets.images['heart']:
-                screen.blit(self.assets.images['heart'], (heart_start_x + i * 35, heart_y))
+                layer.blit(self.assets.images['heart'], (heart_start_x + i * 35, heart_y))
             else:
-                pygame.draw.circle(screen, RED, (heart_start_x + i * 35 + 15, heart_y + 15), 12)
+                pygame.draw.circle(layer, RED, (heart_start_x + i * 35 + 15, heart_y + 15), 12)
+        
+        if quality:
+            self.draw_text(layer, f"Chất lượng: {quality}", 'small', GRAY, 140, 70)
         
         if player:
-            from .config import PLAYER_ABILITIES
             ability = PLAYER_ABILITIES[player.player_type]
             
             ability_x = WIDTH - 250
             ability_y = 30
             
-            self.draw_text(screen, f"Chiêu: {ability['name']}", 'small', BLACK, ability_x, ability_y)
+            self.draw_text(layer, f"Chiêu: {ability['name']}", 'small', BLACK, ability_x, ability_y)
             
-            if player.ability_active:
-                remaining = max(0, player.ability_duration)
-                self.draw_text(screen, f"ĐANG HOẠT ĐỘNG ({remaining:.1f}s)", 'small', GREEN, ability_x, ability_y + 30)
-            elif player.ability_cooldown > 0:
-                self.draw_text(screen, f"Cooldown: {player.ability_cooldown:.1f}s", 'small', RED, ability_x, ability_y + 30)
-            else:
-                self.draw_text(screen, "Nhấn SPACE để sử dụng", 'small', BLUE, ability_x, ability_y + 30)
+            status_text, status_color = status
+            self.draw_text(layer, status_text, 'small', status_color, ability_x, ability_y + 30)
     
     def handle_player_selection_input(self, key):
         if key == pygame.K_LEFT:
@@ -140,7 +232,9 @@ class ScreenManager:
         return None
     
     def handle_difficulty_selection_input(self, key):
-        if key == pygame.K_LEFT:
+        if key == pygame.K_e:
+            self.endless_mode = not self.endless_mode
+        elif key == pygame.K_LEFT:
             self.difficulty_level = max(1, self.difficulty_level - 1)
         elif key == pygame.K_RIGHT:
             self.difficulty_level = min(MAX_DIFFICULTY, self.difficulty_level + 1)
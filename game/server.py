@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import collections
+import sys
+from .config import *
+from .game_objects import Player
+from .simulation import Simulation, drive_player
+from .replay import decode_input
+from .netcode import (FRAME, HELLO, INPUT, MSG_SNAPSHOT, MSG_WELCOME, SNAPSHOT, WELCOME, NetStats, capture,
+                      encode_state, frame, read_frame, uncompressed_size)
+
+class Match(Simulation):
+    # Several players dodging one shared enemy field: the server's authoritative state.
+    # Players are keyed by the id handed out when they join; the base class's own player is unused.
+    def __init__(self, difficulty=1, selected_enemies=None, seed=None, enemy_count=None, endless=False):
+        self.players = {}
+        super().__init__("blue", difficulty, selected_enemies, seed, enemy_count=enemy_count,
+                         array_enemies=enemy_count is not None, endless=endless)
+
+    def add_player(self, player_type):
+        player_id = len(self.players)
+        self.players[player_id] = Player(0, HEIGHT - GROUND_HEIGHT - PLAYER_SIZE, None, player_type,
+                                         self.player_masks.get(player_type))
+        # Spread everyone evenly along the ground
+        for i, player in enumerate(self.players.values()):
+            player.rect.x = WIDTH * (i + 1) // (len(self.players) + 1) - PLAYER_SIZE // 2
+            player.x = player.prev_x = float(player.rect.x)
+        return player_id
+
+    def step(self, dt, inputs):
+        # inputs: player id -> (left, right, ability); events are (name, player id) pairs
+        self.events.clear()
+        if self.game_over:
+            return self.events
+
+        time_warp = False
+        for player_id, player in self.players.items():
+            if player.hp <= 0:
+                continue
+            if drive_player(player, *inputs.get(player_id, (False, False, False)), dt):
+                self.abilities_used += 1
+                self.events.append(("ability", player_id))
+            player.update_abilities(dt)
+            time_warp = time_warp or (player.player_type == "gray" and player.ability_active)
+
+        self.enemy_manager.set_all_speed_modifier(0.3 if time_warp else 1.0)
+        self.score += self.enemy_manager.update_enemies(self.difficulty, dt)
+
+        for player_id, player in self.players.items():
+            if player.hp > 0 and self.enemy_manager.check_collisions(player):
+                self.events.append(("collision", player_id))
+                player.take_damage()
+
+        if self.players and all(player.hp <= 0 for player in self.players.values()):
+            self.game_over = True
+            self.events.append(("game_over", None))
+
+        self.tick += 1
+        self.time += dt
+        return self.events
+
+class Connection:
+    def __init__(self, player_id, writer):
+        self.player_id = player_id
+        self.writer = writer
+        self.connected = True
+        # (sequence number, input) not yet consumed; one is consumed per server tick
+        self.inputs = collections.deque()
+        self.input = (False, False, False)
+        self.last_seq = 0
+        self.acked_tick = 0
+        self.stats = NetStats()
+
+class GameServer:
+    def __init__(self, players=2, difficulty=1, selected_enemies=None, seed=None, enemy_count=None, endless=False,
+                 sim_hz=SIMULATION_HZ, snapshot_every=NET_SNAPSHOT_EVERY, max_seconds=None):
+        self.match = Match(difficulty, selected_enemies, seed, enemy_count, endless)
+        self.expected_players = players
+        self.sim_hz = sim_hz
+        self.snapshot_every = snapshot_every
+        self.max_ticks = int(max_seconds * sim_hz) if max_seconds else None
+        self.connections = {}
+        self.handlers = set()
+        self.history = {}
+        self.started = False
+        self.ready = None
+        self.server = None
+        self.port = None
+        self.elapsed = 0.0
+
+    async def start(self, host="127.0.0.1", port=NET_PORT):
+        self.ready = asyncio.Event()
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def handle_client(self, reader, writer):
+        connection = None
+        self.handlers.add(asyncio.current_task())
+        try:
+            _, type_index = HELLO.unpack(await read_frame(reader))
+            if self.started or len(self.connections) >= self.expected_players:
+                return
+            match = self.match
+            player_id = match.add_player(PLAYER_TYPES[type_index])
+            connection = self.connections[player_id] = Connection(player_id, writer)
+            enemy_mask = sum(1 << ENEMY_TYPES.index(enemy_type) for enemy_type in match.selected_enemies)
+            self.send(connection, WELCOME.pack(MSG_WELCOME, player_id, self.sim_hz, self.snapshot_every,
+                                               match.difficulty, enemy_mask, int(match.endless),
+                                               self.expected_players))
+            if len(self.connections) == self.expected_players:
+                self.ready.set()
+
+            while True:
+                message = await read_frame(reader)
+                connection.stats.received(len(message) + FRAME.size)
+                _, seq, ack, bits = INPUT.unpack(message)
+                connection.inputs.append((seq, decode_input(bits)))
+                connection.acked_tick = max(connection.acked_tick, ack)
+                # A client running ahead of the server would otherwise build up input lag
+                while len(connection.inputs) > NET_INPUT_BUFFER:
+                    connection.inputs.popleft()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if connection:
+                connection.connected = False
+                # A player who drops out is out of the match
+                self.match.players[connection.player_id].hp = 0
+            writer.close()
+
+    def send(self, connection, payload):
+        data = frame(payload)
+        connection.writer.write(data)
+        connection.stats.sent(len(data))
+
+    async def run(self):
+        await self.ready.wait()
+        self.started = True
+        match = self.match
+        dt = 1.0 / self.sim_hz
+        loop = asyncio.get_running_loop()
+        start = next_tick = loop.time()
+
+        while not match.game_over and any(c.connected for c in self.connections.values()):
+            inputs = {}
+            for player_id, connection in self.connections.items():
+                if connection.inputs:
+                    connection.last_seq, connection.input = connection.inputs.popleft()
+                inputs[player_id] = connection.input
+            match.step(dt, inputs)
+            if self.max_ticks and match.tick >= self.max_ticks:
+                match.game_over = True
+
+            if match.tick % self.snapshot_every == 0 or match.game_over:
+                self.broadcast()
+                await asyncio.gather(*(c.writer.drain() for c in self.connections.values() if c.connected),
+                                     return_exceptions=True)
+
+            next_tick += dt
+            delay = next_tick - loop.time()
+            if delay < -MAX_FRAME_TIME:
+                # Fell far behind (machine stalled): drop the backlog instead of racing through it
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+        self.elapsed = loop.time() - start
+        for connection in self.connections.values():
+            connection.writer.close()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        self.server.close()
+        await self.server.wait_closed()
+
+    def broadcast(self):
+        tick = self.match.tick
+        values = capture(self.match, {pid: c.last_seq for pid, c in self.connections.items()})
+        self.history[tick] = values
+        self.history.pop(tick - self.snapshot_every * NET_SNAPSHOT_HISTORY, None)
+        raw_size = SNAPSHOT.size + uncompressed_size(values)
+
+        # Clients that acked the same snapshot share one encoding
+        encoded = {}
+        for connection in self.connections.values():
+            if not connection.connected:
+                continue
+            baseline_tick = connection.acked_tick if connection.acked_tick in self.history else 0
+            payload = encoded.get(baseline_tick)
+            if payload is None:
+                baseline = self.history[baseline_tick] if baseline_tick else None
+                payload = encoded[baseline_tick] = (SNAPSHOT.pack(MSG_SNAPSHOT, tick, baseline_tick) +
+                                                    encode_state(values, baseline))
+            self.send(connection, payload)
+            stats = connection.stats
+            if baseline_tick:
+                stats.delta_snapshots += 1
+            else:
+                stats.full_snapshots += 1
+            stats.snapshot_bytes += len(payload)
+            stats.uncompressed_bytes += raw_size
+
+    def report(self):
+        seconds = max(self.elapsed, 1e-9)
+        lines = [f"Máy chủ: {self.match.tick} tick trong {seconds:.1f}s, điểm {self.match.score}"]
+        for player_id, connection in sorted(self.connections.items()):
+            s = connection.stats.summary(seconds)
+            lines.append(f"  người chơi {player_id}: xuống {s['up_bytes_per_s'] / 1024:.2f} KiB/s, "
+                         f"lên {s['down_bytes_per_s'] / 1024:.2f} KiB/s, {s.get('snapshots', 0)} snapshot "
+                         f"({s.get('full_snapshots', 0)} đầy đủ), TB {s.get('avg_snapshot_bytes', 0):.0f} byte, "
+                         f"nén {s.get('compression_ratio', 0):.1f}x")
+        return "\n".join(lines)
+
+async def serve(server, host, port):
+    await server.start(host, port)
+    print(f"Đang chờ {server.expected_players} người chơi trên {host}:{server.port}")
+    await server.run()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Authoritative server for networked matches")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--difficulty", type=int, default=1)
+    parser.add_argument("--enemy-types", nargs="+", default=ENEMY_TYPES, choices=ENEMY_TYPES)
+    parser.add_argument("--enemies", type=int, default=None, help="fixed enemy count (NumPy enemy store)")
+    parser.add_argument("--endless", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--sim-hz", type=int, default=SIMULATION_HZ)
+    parser.add_argument("--snapshot-every", type=int, default=NET_SNAPSHOT_EVERY, help="ticks between snapshots")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.players, args.difficulty, args.enemy_types, args.seed, args.enemies, args.endless,
+                        args.sim_hz, args.snapshot_every)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    print(server.report())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import random
+from .config import *
+from .game_objects import Player, EnemyManager, Ground, TICK_DT
+from .assets import collision_masks
+
+def drive_player(player, left, right, ability, dt):
+    # One tick of player input; returns True when the ability was triggered
+    player.store_previous_position()
+    if left:
+        player.move_left(dt)
+    elif right:
+        player.move_right(WIDTH, dt)
+    else:
+        player.stop()
+    return ability and player.use_ability()
+
+class Simulation:
+    def __init__(self, player_type="blue", difficulty=1, selected_enemies=None, seed=None,
+                 player_sprites=None, enemy_sprites=None, enemy_count=None, array_enemies=False,
+                 endless=False, masks=None):
+        self.player_type = player_type
+        self.difficulty = difficulty
+        self.selected_enemies = list(selected_enemies or ENEMY_TYPES)
+        self.player_sprites = player_sprites
+        self.enemy_sprites = enemy_sprites or {}
+        self.enemy_count = enemy_count
+        self.endless = endless
+
+        self.ground = Ground()
+        if endless:
+            from .endless import EndlessEnemyManager
+            self.enemy_manager = EndlessEnemyManager()
+        elif array_enemies:
+            from .enemy_array import ArrayEnemyManager
+            self.enemy_manager = ArrayEnemyManager()
+        else:
+            self.enemy_manager = EnemyManager()
+        # (player masks, enemy masks) by type; the shared headless set unless the caller has its own
+        self.player_masks, self.enemy_masks = masks or collision_masks()
+        self.enemy_manager.masks = self.enemy_masks
+        self.events = []
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.enemy_manager.rng = self.rng
+
+        self.tick = 0
+        self.time = 0.0
+        self.score = 0
+        self.abilities_used = 0
+        self.game_over = False
+        self.events.clear()
+
+        self.player = Player(
+            WIDTH // 2 - PLAYER_SIZE // 2,
+            HEIGHT - GROUND_HEIGHT - PLAYER_SIZE,
+            self.player_sprites,
+            self.player_type,
+            self.player_masks.get(self.player_type)
+        )
+
+        self.enemy_manager.create_enemies(self.difficulty, self.selected_enemies, self.enemy_sprites,
+                                          self.enemy_count)
+
+    @property
+    def wave(self):
+        return self.enemy_manager.scheduler.wave if self.endless else None
+
+    def apply_input(self, left=False, right=False, ability=False, dt=TICK_DT):
+        if drive_player(self.player, left, right, ability, dt):
+            self.abilities_used += 1
+            self.events.append("ability")
+
+    def step(self, dt=TICK_DT, left=False, right=False, ability=False):
+        self.events.clear()
+        if self.game_over:
+            return self.events
+
+        self.apply_input(left, right, ability, dt)
+        self.player.update_abilities(dt)
+
+        if self.player.player_type == "gray" and self.player.ability_active:
+            self.enemy_manager.set_all_speed_modifier(0.3)
+        else:
+            self.enemy_manager.set_all_speed_modifier(1.0)
+
+        self.score += self.enemy_manager.update_enemies(self.difficulty, dt)
+
+        if self.enemy_manager.check_collisions(self.player):
+            self.events.append("collision")
+            if self.player.take_damage():
+                self.game_over = True
+                self.events.append("game_over")
+
+        self.tick += 1
+        self.time += dt
+        return self.events
+
+    def run(self, policy=None, max_ticks=60 * 60 * 10, dt=TICK_DT):
+        # policy(sim) -> (left, right, ability); no policy means the player stands still
+        while not self.game_over and self.tick < max_ticks:
+            if policy:
+                self.step(dt, *policy(self))
+            else:
+                self.step(dt)
+        return self.score
@@ -0,0 +1,62 @@
+from .config import *
+
+class SpatialGrid:
+    # Uniform grid keyed by the cell holding each item's top-left corner. Items may be at
+    # most cell_size wide/tall, so a query only needs to widen its cell range by one cell
+    # up and to the left to see everything that can overlap it.
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.item_cells = {}
+
+    def clear(self):
+        self.cells.clear()
+        self.item_cells.clear()
+
+    def cell_of(self, rect):
+        return (rect.x // self.cell_size, rect.y // self.cell_size)
+
+    def bucket(self, key):
+        bucket = self.cells.get(key)
+        if bucket is None:
+            bucket = self.cells[key] = []
+        return bucket
+
+    def insert(self, item):
+        key = self.cell_of(item.rect)
+        self.item_cells[item] = key
+        self.bucket(key).append(item)
+
+    # Emptied buckets are kept so that cells being re-entered don't allocate new lists
+    def remove(self, item):
+        key = self.item_cells.pop(item)
+        self.cells[key].remove(item)
+
+    def update(self, item):
+        key = self.cell_of(item.rect)
+        old_key = self.item_cells[item]
+        if key != old_key:
+            self.cells[old_key].remove(item)
+            self.item_cells[item] = key
+            self.bucket(key).append(item)
+
+    def query(self, rect):
+        size = self.cell_size
+        cells = self.cells
+        found = []
+        for cx in range(rect.left // size - 1, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size - 1, (rect.bottom - 1) // size + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(item for item in bucket if rect.colliderect(item.rect))
+        return found
+
+    def query_many(self, rects):
+        found = []
+        seen = set()
+        for rect in rects:
+            for item in self.query(rect):
+                if item not in seen:
+                    seen.add(item)
+                    found.append(item)
+        return found
@@ -0,0 +1,98 @@
+import contextlib
+import threading
+import time
+import pygame
+
+# Staged startup: Game opens the window and loads only the start screen's fonts and logo
+# before its first frame; sprites, masks, sounds and the decoded music tracks come in on an
+# AssetLoader thread while the start screen is already up. StartupTimer records every phase
+# on either thread for --startup-report.
+
+class StartupTimer:
+    def __init__(self, origin=None):
+        # origin: perf_counter() when the process started its work (main.py takes it before imports)
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []
+        self.lock = threading.Lock()
+        self.first_frame = None
+        self.loaded = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.phases.append((name, threading.current_thread().name, start, end))
+
+    def record(self, name, start):
+        # A phase that started before the timer existed (imports)
+        with self.lock:
+            self.phases.append((name, threading.current_thread().name, start, time.perf_counter()))
+
+    def frame_presented(self):
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter()
+
+    def complete(self):
+        return self.first_frame is not None and self.loaded is not None
+
+    def report(self):
+        ms = lambda t: (t - self.origin) * 1000
+        lines = ["Khởi động (ms từ lúc bắt đầu):"]
+        for name, thread, start, end in sorted(self.phases, key=lambda phase: phase[2]):
+            lines.append(f"  {name:22s} {thread:14s} {ms(start):8.1f} -> {ms(end):8.1f}  ({(end - start) * 1000:7.1f})")
+        if self.first_frame is not None:
+            lines.append(f"  Khung hình đầu tiên: {ms(self.first_frame):.1f} ms")
+        if self.loaded is not None:
+            lines.append(f"  Tải xong toàn bộ tài nguyên: {ms(self.loaded):.1f} ms")
+        return "\n".join(lines)
+
+class AssetLoader(threading.Thread):
+    # Loads everything the start screen doesn't need. wait() is the fallback for a player
+    # who gets past the start screen first: the game blocks until loading finishes. A failure
+    # other than the mixer's is kept and raised from wait() on the game's thread.
+    def __init__(self, assets, audio, timer):
+        super().__init__(name="asset-loader", daemon=True)
+        self.assets = assets
+        self.audio = audio
+        self.timer = timer
+        self.done = threading.Event()
+        self.error = None
+
+    def run(self):
+        assets = self.assets
+        timer = self.timer
+        try:
+            with timer.phase("sprites"):
+                assets.load_sprites()
+            with timer.phase("masks"):
+                assets.load_masks()
+            with timer.phase("images"):
+                assets.load_images()
+            with timer.phase("mixer.init"):
+                try:
+                    pygame.mixer.init()
+                except pygame.error as e:
+                    print(f"Không khởi tạo được âm thanh: {e}")
+            with timer.phase("sounds"):
+                assets.load_sounds()
+            with timer.phase("music"):
+                self.audio.load()
+        except Exception as e:
+            self.error = e
+        finally:
+            timer.loaded = time.perf_counter()
+            self.done.set()
+
+    def ready(self):
+        return self.done.is_set()
+
+    def wait(self):
+        if not self.done.is_set():
+            with self.timer.phase("waiting for assets"):
+                self.done.wait()
+        if self.error is not None:
+            raise self.error
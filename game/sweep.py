@@ -0,0 +1,143 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from .config import *
+from .policies import POLICIES, make_policy
+from .simulation import Simulation
+
+# Balance sweep: seeded headless games over every player type x difficulty x enemy-type
+# subset, spread over a process pool. Each finished run is appended to a JSONL cache as
+# soon as it completes, so an interrupted sweep resumes where it stopped.
+
+def enemy_subsets():
+    for size in range(1, len(ENEMY_TYPES) + 1):
+        for subset in itertools.combinations(ENEMY_TYPES, size):
+            yield subset
+
+def run_key(job):
+    player_type, difficulty, enemies, seed, policy, max_ticks, sim_hz = job
+    return f"{player_type}|{difficulty}|{'+'.join(enemies)}|{seed}|{policy}|{max_ticks}|{sim_hz}"
+
+def run_game(job):
+    player_type, difficulty, enemies, seed, policy, max_ticks, sim_hz = job
+    sim = Simulation(player_type, difficulty, enemies, seed=seed)
+    sim.run(make_policy(policy, seed), max_ticks, 1.0 / sim_hz)
+    return {
+        "key": run_key(job),
+        "player": player_type,
+        "difficulty": difficulty,
+        "enemies": "+".join(enemies),
+        "seed": seed,
+        "policy": policy,
+        "survival_time": sim.time,
+        "survived": not sim.game_over,
+        "score": sim.score,
+    }
+
+def load_cache(path):
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    # A line cut short when the previous sweep was interrupted
+                    continue
+                results[result["key"]] = result
+    return results
+
+def quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def describe(values):
+    ordered = sorted(values)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p10": quantile(ordered, 0.10),
+        "p50": quantile(ordered, 0.50),
+        "p90": quantile(ordered, 0.90),
+    }
+
+# Columns of a summary row, as summarize() fills them in
+SUMMARY_FIELDS = (["player", "difficulty", "enemies", "runs", "survival_rate"]
+                  + [f"{metric}_{stat}" for metric in ("survival_time", "score") for stat in ("mean", "p10", "p50", "p90")])
+
+def summarize(results):
+    groups = {}
+    for result in results:
+        groups.setdefault((result["player"], result["difficulty"], result["enemies"]), []).append(result)
+
+    summary = []
+    for (player_type, difficulty, enemies), runs in sorted(groups.items()):
+        row = {"player": player_type, "difficulty": difficulty, "enemies": enemies, "runs": len(runs),
+               "survival_rate": sum(run["survived"] for run in runs) / len(runs)}
+        for metric in ("survival_time", "score"):
+            for stat, value in describe([run[metric] for run in runs]).items():
+                row[f"{metric}_{stat}"] = round(value, 3)
+        summary.append(row)
+    return summary
+
+def write_summary(summary, path):
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            # Fixed columns, so an empty sweep still writes the header
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(summary)
+    else:
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless balance sweep over player type x difficulty x enemy mix")
+    parser.add_argument("--seeds", type=int, default=20, help="games per combination")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--max-seconds", type=float, default=120.0, help="cap on simulated time per game")
+    parser.add_argument("--sim-hz", type=int, default=SIMULATION_HZ)
+    parser.add_argument("--players", nargs="+", default=PLAYER_TYPES, choices=PLAYER_TYPES)
+    parser.add_argument("--difficulties", nargs="+", type=int, default=list(range(1, MAX_DIFFICULTY + 1)))
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--cache", default="sweep_cache.jsonl", help="per-run results; reused on resume")
+    parser.add_argument("--out", default="sweep_summary.csv", help="summary as .csv or .json")
+    args = parser.parse_args(argv)
+    if args.seeds < 1:
+        parser.error("--seeds phải lớn hơn 0")
+
+    max_ticks = int(args.max_seconds * args.sim_hz)
+    jobs = [
+        (player_type, difficulty, enemies, seed, args.policy, max_ticks, args.sim_hz)
+        for player_type in args.players
+        for difficulty in args.difficulties
+        for enemies in enemy_subsets()
+        for seed in range(args.seeds)
+    ]
+
+    cached = load_cache(args.cache)
+    pending = [job for job in jobs if run_key(job) not in cached]
+    print(f"{len(jobs)} ván, {len(jobs) - len(pending)} đã có trong cache, chạy {len(pending)} ván "
+          f"trên {args.jobs} tiến trình")
+
+    start = time.perf_counter()
+    if pending:
+        with open(args.cache, "a") as cache, multiprocessing.Pool(args.jobs) as pool:
+            for done, result in enumerate(pool.imap_unordered(run_game, pending, chunksize=8), 1):
+                cache.write(json.dumps(result) + "\n")
+                cached[result["key"]] = result
+                if done % 500 == 0:
+                    cache.flush()
+                    print(f"  {done}/{len(pending)} ({time.perf_counter() - start:.1f}s)")
+
+    summary = summarize(cached[run_key(job)] for job in jobs)
+    write_summary(summary, args.out)
+    print(f"Xong sau {time.perf_counter() - start:.1f}s, đã ghi {len(summary)} dòng vào {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
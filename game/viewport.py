@@ -0,0 +1,33 @@
+import pygame
+from .config import *
+
+class Viewport:
+    # Maps the game's logical WIDTH x HEIGHT coordinates onto a render target `scale` times
+    # that size. Game logic never sees it; only the draw calls convert positions, and
+    # sprites are resampled once on first use and cached per source surface.
+    def __init__(self, scale=RENDER_SCALE):
+        self.scale = scale
+        self.size = (round(WIDTH * scale), round(HEIGHT * scale))
+        self.sprites = {}
+
+    def point(self, x, y):
+        return round(x * self.scale), round(y * self.scale)
+
+    def length(self, value):
+        return max(1, round(value * self.scale))
+
+    def rect(self, rect):
+        # Edges are rounded rather than sizes, so rects that touch in logical space still touch
+        left, top = self.point(rect[0], rect[1])
+        right, bottom = self.point(rect[0] + rect[2], rect[1] + rect[3])
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def resample(self, surface):
+        width, height = surface.get_size()
+        return pygame.transform.smoothscale(surface, (self.length(width), self.length(height)))
+
+    def sprite(self, surface):
+        scaled = self.sprites.get(surface)
+        if scaled is None:
+            scaled = self.sprites[surface] = self.resample(surface)
+        return scaled
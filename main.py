@@ -1,5 +1,69 @@
+import time
+# Taken before the imports (pygame and NumPy alone are a good part of startup)
+STARTED = time.perf_counter()
+
+import argparse
 from game.game import Game
+from game.config import (SIMULATION_HZ, RENDER_FPS, RENDER_SCALE, LEADERBOARD_PATH, NET_PORT, CAPTURE_FPS,
+                         MAX_DIFFICULTY)
+from game.capture import CAPTURE_FORMATS
+from game.pacing import PACING_MODES
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pokemon Dodger")
+    parser.add_argument("--enemies", type=int, default=None,
+                        help="stress mode: fixed number of enemies (NumPy enemy store)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and present only the changed parts of the screen while playing")
+    parser.add_argument("--sim-hz", type=int, default=SIMULATION_HZ, help="fixed simulation tick rate")
+    parser.add_argument("--fps", type=int, default=RENDER_FPS,
+                        help="render frame cap (0 = uncapped); gameplay speed does not depend on it")
+    parser.add_argument("--profile", action="store_true",
+                        help="record per-phase frame timings from startup (F3 overlay, F4 export)")
+    parser.add_argument("--profile-out", default=None,
+                        help="write the frame profile on exit (.json Chrome trace or .csv)")
+    parser.add_argument("--no-replays", action="store_true", help="do not save input replays of finished runs")
+    parser.add_argument("--pacing", choices=PACING_MODES, default="sleep",
+                        help="frame pacing: sleep (default), busy, hybrid sleep+spin, vsync or uncapped")
+    parser.add_argument("--late-input", action="store_true",
+                        help="wait out the frame before reading input, so it is sampled right before the simulation steps")
+    parser.add_argument("--latency-report", action="store_true",
+                        help="print frame-time jitter and input-to-present latency on exit")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE,
+                        help="draw at this fraction of 1280x720 and upscale on present (0.5 = 640x360)")
+    parser.add_argument("--output", choices=("scaled", "blit"), default="scaled",
+                        help="upscale with SDL's renderer (pygame.SCALED) or a software scaling blit")
+    parser.add_argument("--resizable", action="store_true", help="resizable window")
+    parser.add_argument("--fullscreen", action="store_true", help="start fullscreen (F11 toggles)")
+    parser.add_argument("--no-leaderboard", action="store_true", help="do not record finished runs")
+    parser.add_argument("--connect", default=None, metavar="HOST[:PORT]",
+                        help="join a networked match run by python -m game.server")
+    parser.add_argument("--capture", choices=CAPTURE_FORMATS, default=None,
+                        help="record a video clip of every run into captures/ (F9 starts/stops one any time)")
+    parser.add_argument("--capture-fps", type=int, default=CAPTURE_FPS, help="frames per second kept in clips")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup phase took, once everything has loaded")
+    parser.add_argument("--no-governor", action="store_true",
+                        help="always draw at full quality instead of degrading effects, HUD and sprites under load")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="soak test: the built-in bot plays run after run, cycling through the characters")
+    parser.add_argument("--difficulty", type=int, default=1, choices=range(1, MAX_DIFFICULTY + 1),
+                        metavar="1-10", help="starting difficulty (the level autopilot runs play at)")
+    args = parser.parse_args()
+
+    connect = None
+    if args.connect:
+        host, _, port = args.connect.partition(":")
+        connect = (host, int(port) if port else NET_PORT)
+
+    game = Game(enemy_count=args.enemies, dirty_rects=args.dirty_rects,
+                simulation_hz=args.sim_hz, render_fps=args.fps,
+                profile=args.profile, profile_out=args.profile_out,
+                record_replays=not args.no_replays, pacing=args.pacing, late_input=args.late_input,
+                latency_report=args.latency_report, render_scale=args.render_scale, output=args.output,
+                resizable=args.resizable, fullscreen=args.fullscreen,
+                leaderboard_path=None if args.no_leaderboard else LEADERBOARD_PATH, connect=connect,
+                capture=args.capture, capture_fps=args.capture_fps,
+                startup_report=args.startup_report, started=STARTED,
+                autopilot=args.autopilot, difficulty=args.difficulty, governor=not args.no_governor)
+    game.run()